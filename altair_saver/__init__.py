@@ -1,20 +1,31 @@
 """Tools for saving altair charts"""
-from altair_saver._core import render, save, available_formats
+import sys
+from typing import Any
+
+from altair_saver._core import (
+    available_formats,
+    render,
+    render_async,
+    save,
+    save_async,
+    save_many,
+)
 from altair_saver.savers import (
     Saver,
     BasicSaver,
-    HTMLSaver,
-    JavascriptError,
     NodeSaver,
-    SeleniumSaver,
 )
-from altair_saver import types
+from altair_saver import cache, savers, types
 
 __version__ = "0.6.0.dev0"
 __all__ = [
     "available_formats",
+    "cache",
     "render",
+    "render_async",
     "save",
+    "save_async",
+    "save_many",
     "types",
     "BasicSaver",
     "HTMLSaver",
@@ -23,3 +34,14 @@ __all__ = [
     "Saver",
     "SeleniumSaver",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # HTMLSaver, SeleniumSaver and JavascriptError are imported on first access.
+    if name in savers._LAZY_ATTRIBUTES:
+        return getattr(savers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if sys.version_info < (3, 7):  # Module __getattr__ requires Python 3.7.
+    from altair_saver.savers import HTMLSaver, JavascriptError, SeleniumSaver  # noqa
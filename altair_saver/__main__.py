@@ -0,0 +1,5 @@
+import sys
+
+from altair_saver._cli import main
+
+sys.exit(main())
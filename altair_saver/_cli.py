@@ -0,0 +1,238 @@
+"""Command-line interface for saving chart specifications."""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import altair as alt
+
+from altair_saver._core import save_many, _SAVER_FORMATS
+from altair_saver.cache import spec_hash
+from altair_saver.types import JSONDict
+
+# Input file extensions, and the mode of the specs they contain.
+INPUT_EXTENSIONS = {".vl.json": "vega-lite", ".vg.json": "vega"}
+
+# Output file extensions of formats that do not use the format name.
+OUTPUT_EXTENSIONS = {"vega": "vg.json", "vega-lite": "vl.json"}
+
+# Name of the file recording the input hash of each output in a directory.
+MANIFEST_NAME = ".altair_saver.json"
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="altair_saver",
+        description="Save Vega and Vega-Lite chart specifications to other formats.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Input .vl.json or .vg.json files, or directories to search for them.",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        action="append",
+        default=[],
+        help="Output format; may be repeated or comma-separated (default: png).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="Directory for output files, mirroring the layout of input directories "
+        "(default: alongside each input).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of charts to save in parallel.",
+    )
+    parser.add_argument(
+        "-m",
+        "--method",
+        choices=["node", "selenium", "html", "basic"],
+        default=None,
+        help="The save method to use (default: chosen by format).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Save all outputs, including those whose inputs have not changed.",
+    )
+    return parser
+
+
+def _find_inputs(paths: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """Yield (filename, relative name, mode) for each input file within paths.
+
+    The relative name is the path of the file relative to the directory given
+    in paths, or its basename for files given directly.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    mode = _input_mode(filename)
+                    if mode is not None:
+                        filename = os.path.join(dirpath, filename)
+                        yield filename, os.path.relpath(filename, path), mode
+        else:
+            yield path, os.path.basename(path), _input_mode(path) or "vega-lite"
+
+
+def _input_mode(filename: str) -> Optional[str]:
+    for extension, mode in INPUT_EXTENSIONS.items():
+        if filename.endswith(extension):
+            return mode
+    return None
+
+
+def _output_path(
+    filename: str, relname: str, fmt: str, output_dir: Optional[str]
+) -> str:
+    base = filename if output_dir is None else os.path.join(output_dir, relname)
+    for extension in INPUT_EXTENSIONS:
+        if base.endswith(extension):
+            base = base[: -len(extension)]
+            break
+    else:
+        base = os.path.splitext(base)[0]
+    return f"{base}.{OUTPUT_EXTENSIONS.get(fmt, fmt)}"
+
+
+def _read_manifest(directory: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(directory: str, manifest: Dict[str, str]) -> None:
+    filename = os.path.join(directory, MANIFEST_NAME)
+    with open(filename + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(filename + ".tmp", filename)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the altair_saver command line interface.
+
+    Outputs are skipped when they exist and the hash of their input (with the
+    format, method and package versions) matches the hash recorded in the
+    manifest file of the output directory when they were last saved.
+
+    Parameters
+    ----------
+    argv : list of strings (optional)
+        The command-line arguments. Default is sys.argv[1:].
+
+    Returns
+    -------
+    status : int
+        The exit status: 0 on success, or 1 if any chart failed to save.
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    fmts = [fmt for value in args.format for fmt in value.split(",") if fmt]
+    if not fmts:
+        fmts = ["png"]
+    if args.jobs < 1:
+        parser.error("--jobs must be a positive integer")
+    selenium_fmts = set(sum(_SAVER_FORMATS["selenium"].values(), []))
+    if (
+        args.jobs > 1
+        and args.method in (None, "selenium")
+        and selenium_fmts & set(fmts)
+    ):
+        # Let each job render on its own browser.
+        from altair_saver.savers import SeleniumSaver
+
+        SeleniumSaver.driver_pool_size = max(SeleniumSaver.driver_pool_size, args.jobs)
+
+    status = 0
+    skipped = 0
+    manifests: Dict[str, Dict[str, str]] = {}
+    items: Dict[str, List[Tuple[JSONDict, str, str]]] = {}
+    keys: Dict[str, List[str]] = {}
+    # The input file of each output file, by absolute path.
+    sources: Dict[str, str] = {}
+    seen: Set[str] = set()
+    for filename, relname, mode in _find_inputs(args.inputs):
+        if os.path.abspath(filename) in seen:
+            continue  # The same input was listed more than once.
+        seen.add(os.path.abspath(filename))
+        try:
+            with open(filename) as f:
+                spec = json.load(f)
+        except (OSError, ValueError) as err:
+            print(f"{filename}: {err}", file=sys.stderr)
+            status = 1
+            continue
+        for fmt in fmts:
+            output = _output_path(filename, relname, fmt, args.output_dir)
+            if os.path.abspath(output) == os.path.abspath(filename):
+                continue
+            source = sources.setdefault(
+                os.path.abspath(output), os.path.abspath(filename)
+            )
+            if source != os.path.abspath(filename):
+                print(
+                    f"{filename}: output {output} conflicts with {source}",
+                    file=sys.stderr,
+                )
+                status = 1
+                continue
+            key = spec_hash(
+                spec,
+                fmt,
+                mode,
+                args.method,
+                alt.VEGA_VERSION,
+                alt.VEGALITE_VERSION,
+                alt.VEGAEMBED_VERSION,
+            )
+            directory, name = os.path.split(output)
+            if directory not in manifests:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                manifests[directory] = _read_manifest(directory)
+            if (
+                not args.force
+                and os.path.exists(output)
+                and manifests[directory].get(name) == key
+            ):
+                skipped += 1
+                continue
+            items.setdefault(mode, []).append((spec, output, fmt))
+            keys.setdefault(mode, []).append(key)
+
+    saved = 0
+    updated = set()
+    for mode, mode_items in items.items():
+        results = save_many(
+            mode_items, mode=mode, method=args.method, max_workers=args.jobs
+        )
+        for i, result in results:
+            output = mode_items[i][1]
+            if isinstance(result, Exception):
+                print(f"{output}: {type(result).__name__}: {result}", file=sys.stderr)
+                status = 1
+                continue
+            directory, name = os.path.split(output)
+            manifests[directory][name] = keys[mode][i]
+            updated.add(directory)
+            saved += 1
+
+    for directory in updated:
+        _write_manifest(directory, manifests[directory])
+    failed = sum(len(mode_items) for mode_items in items.values()) - saved
+    print(f"{saved} saved, {skipped} up to date, {failed} failed")
+    return status
@@ -1,28 +1,89 @@
+import asyncio
 from collections import OrderedDict
-from typing import Any, Dict, IO, Iterable, Optional, Set, Type, Union
+from concurrent.futures import (
+    as_completed,
+    Executor,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+import json
+import os
+import shutil
+import sys
+from typing import (
+    Any,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 import warnings
+import weakref
 
 import altair as alt
 
-from altair_saver.savers import (
-    Saver,
-    BasicSaver,
-    HTMLSaver,
-    NodeSaver,
-    SeleniumSaver,
-)
-from altair_saver.types import JSONDict, Mimebundle
-from altair_saver._utils import extract_format, infer_mode_from_spec
+from altair_saver import savers
+from altair_saver.savers import Saver
+from altair_saver.cache import result_cache, spec_hash
+from altair_saver.types import JSONDict, Mimebundle, MimebundleContent
+from altair_saver._utils import extract_format, infer_mode_from_spec, maybe_open
 
-_SAVER_METHODS: Dict[str, Type[Saver]] = OrderedDict(
+# Save methods in order of preference, with the name of their class in
+# altair_saver.savers. Classes are looked up when first needed, so that
+# backends with heavy dependencies are imported only once considered.
+_SAVER_METHODS: Dict[str, str] = OrderedDict(
     [
-        ("basic", BasicSaver),
-        ("html", HTMLSaver),
-        ("selenium", SeleniumSaver),
-        ("node", NodeSaver),
+        ("basic", "BasicSaver"),
+        ("html", "HTMLSaver"),
+        ("selenium", "SeleniumSaver"),
+        ("node", "NodeSaver"),
     ]
 )
 
+# The valid_formats of each save method's class, so that selecting a saver by
+# format imports only the classes that support the format.
+_SAVER_FORMATS: Dict[str, Dict[str, List[str]]] = {
+    "basic": {"vega": ["json", "vega"], "vega-lite": ["json", "vega-lite"]},
+    "html": {"vega": ["html"], "vega-lite": ["html"]},
+    "selenium": {"vega": ["png", "svg"], "vega-lite": ["png", "svg", "vega"]},
+    "node": {"vega": ["pdf", "png", "svg"], "vega-lite": ["pdf", "png", "svg", "vega"]},
+}
+
+
+# Executables needed by save methods whose classes are imported lazily, so that
+# the method can be skipped without importing it if none of them is available.
+_SAVER_EXECUTABLES: Dict[str, List[str]] = {
+    "selenium": ["chromedriver", "geckodriver"],
+}
+
+# The number of charts passed to each call of a saver's save_many() method.
+_SAVE_MANY_BATCH_SIZE = 100
+
+
+def _saver_class(method: str) -> Type[Saver]:
+    """Get the Saver class of a save method, importing it if necessary."""
+    return getattr(savers, _SAVER_METHODS[method])
+
+
+def _may_be_enabled(method: str) -> bool:
+    """Return False if a save method is certainly not enabled.
+
+    This avoids importing the class of the method if it has not been imported.
+    """
+    module = savers._LAZY_ATTRIBUTES.get(_SAVER_METHODS[method])
+    if method not in _SAVER_EXECUTABLES or module is None or module in sys.modules:
+        return True
+    return any(shutil.which(name) for name in _SAVER_EXECUTABLES[method])
+
 
 def _select_saver(
     method: Optional[Union[str, Type[Saver]]],
@@ -55,7 +116,7 @@ def _select_saver(
         return method
     elif isinstance(method, str):
         if method in _SAVER_METHODS:
-            return _SAVER_METHODS[method]
+            return _saver_class(method)
         else:
             raise ValueError(f"Unrecognized method: {method!r}")
     elif method is None:
@@ -63,9 +124,11 @@ def _select_saver(
             if fp is None:
                 raise ValueError("Either fmt or fp must be specified")
             fmt = extract_format(fp)
-        for s in _SAVER_METHODS.values():
-            if s.enabled() and fmt in s.valid_formats[mode]:
-                return s
+        for name in _SAVER_METHODS:
+            if fmt in _SAVER_FORMATS[name][mode] and _may_be_enabled(name):
+                s = _saver_class(name)
+                if s.enabled():
+                    return s
         raise ValueError(f"No enabled saver found that supports format={fmt!r}")
     else:
         raise ValueError(f"Unrecognized method: {method}")
@@ -79,6 +142,8 @@ def save(
     embed_options: Optional[JSONDict] = None,
     method: Optional[Union[str, Type[Saver]]] = None,
     suppress_data_warning: bool = False,
+    cache: bool = False,
+    validate: bool = True,
     **kwargs: Any,
 ) -> Optional[Union[str, bytes]]:
     """Save an Altair, Vega, or Vega-Lite chart
@@ -103,6 +168,13 @@ def save(
         or a subclass of Saver.
     suppress_data_warning : bool (optional)
         If True, suppress warning about json & csv data transformers.
+    cache : bool (optional)
+        If True, the result is looked up in and stored to
+        ``altair_saver.cache.result_cache``. Default is False.
+    validate : bool (optional)
+        If False, skip validation of an Altair chart against the Vega-Lite schema.
+        Default is True; validation is skipped if the chart has not changed since it
+        was last validated.
     **kwargs :
         Additional keyword arguments are passed to Saver initialization.
 
@@ -132,6 +204,10 @@ def save(
     standalone : boolean
         For method="html", specify whether to create a standalone HTML file.
         Default is True for save().
+    deterministic_id : boolean
+        For method="html", specify whether the id of the chart's output div is derived
+        from a hash of the spec and options, so that identical input produces identical
+        output. Default is True for standalone HTML, False otherwise.
     webdriver : string or WebDriver
         For method="selenium", the type of webdriver to use: one of "chrome", "firefox",
         or a selenium.WebDriver object. Defaults to what is available on your system.
@@ -148,17 +224,82 @@ def save(
         If fp is None, the serialized chart is returned.
         If fp is specified, the return value is None.
     """
-    spec: JSONDict = {}
-    if isinstance(chart, dict):
-        spec = chart
-    else:
-        if alt.data_transformers.get() in [alt.data.to_json, alt.data.to_csv]:
-            warnings.warn(
-                f"save() may not function properly with the {alt.data_transformers.active!r} "
-                "data transformer: use alt.data_transformers.enable('default'). To "
-                "suppress this warning, pass suppress_data_warning=True."
-            )
-        spec = chart.to_dict()
+    saver = _get_saver(
+        chart,
+        fp,
+        fmt,
+        mode,
+        embed_options,
+        method,
+        suppress_data_warning,
+        validate,
+        **kwargs,
+    )
+    if not cache:
+        return saver.save(fp=fp, fmt=fmt)
+    fmt = saver._check_format(fp, fmt)
+    key = _result_key(saver, fmt, "save", kwargs)
+    content = _cached_result(key)
+    if content is None:
+        content = saver._serialize(fmt, "save")
+        _store_result(key, content)
+    return saver._write(content, fp, fmt)
+
+
+async def save_async(
+    chart: Union[alt.TopLevelMixin, JSONDict],
+    fp: Optional[Union[IO, str]] = None,
+    fmt: Optional[str] = None,
+    mode: Optional[str] = None,
+    embed_options: Optional[JSONDict] = None,
+    method: Optional[Union[str, Type[Saver]]] = None,
+    suppress_data_warning: bool = False,
+    cache: bool = False,
+    validate: bool = True,
+    **kwargs: Any,
+) -> Optional[Union[str, bytes]]:
+    """Save an Altair, Vega, or Vega-Lite chart without blocking the event loop.
+
+    This is the coroutine version of save(); see its documentation for a
+    description of the parameters.
+    """
+    saver = _get_saver(
+        chart,
+        fp,
+        fmt,
+        mode,
+        embed_options,
+        method,
+        suppress_data_warning,
+        validate,
+        **kwargs,
+    )
+    if not cache:
+        return await saver.save_async(fp=fp, fmt=fmt)
+    fmt = saver._check_format(fp, fmt)
+    key = _result_key(saver, fmt, "save", kwargs)
+    content = _cached_result(key)
+    if content is None:
+        content = await saver._serialize_async(fmt, "save")
+        _store_result(key, content)
+    return saver._write(content, fp, fmt)
+
+
+def _get_saver(
+    chart: Union[alt.TopLevelMixin, JSONDict],
+    fp: Optional[Union[IO, str]],
+    fmt: Optional[str],
+    mode: Optional[str],
+    embed_options: Optional[JSONDict],
+    method: Optional[Union[str, Type[Saver]]],
+    suppress_data_warning: bool,
+    validate: bool,
+    **kwargs: Any,
+) -> Saver:
+    """Construct the Saver used by save()."""
+    if not isinstance(chart, dict):
+        _check_data_transformer()
+    spec = _chart_to_spec(chart, validate)
 
     if mode is None:
         mode = infer_mode_from_spec(spec)
@@ -167,9 +308,234 @@ def save(
         embed_options = alt.renderers.options.get("embed_options", None)
 
     Saver = _select_saver(method, mode=mode, fmt=fmt, fp=fp)
-    saver = Saver(spec, mode=mode, embed_options=embed_options, **kwargs)
+    return Saver(spec, mode=mode, embed_options=embed_options, **kwargs)
+
+
+def _check_data_transformer() -> None:
+    if alt.data_transformers.get() in [alt.data.to_json, alt.data.to_csv]:
+        warnings.warn(
+            f"save() may not function properly with the {alt.data_transformers.active!r} "
+            "data transformer: use alt.data_transformers.enable('default'). To "
+            "suppress this warning, pass suppress_data_warning=True."
+        )
+
+
+# Hash of the most recently validated spec of each live chart, by chart id.
+_validated_specs: Dict[int, str] = {}
+
+
+def _chart_to_spec(
+    chart: Union[alt.TopLevelMixin, JSONDict], validate: bool = True
+) -> JSONDict:
+    """Return the specification of a chart to be saved.
+
+    Schema validation is skipped if the chart's specification is unchanged
+    since it was last validated.
+    """
+    if isinstance(chart, dict):
+        return chart
+    if not validate:
+        return chart.to_dict(validate=False)
+
+    key = id(chart)
+    if key in _validated_specs:
+        spec = chart.to_dict(validate=False)
+        if _validated_specs.get(key) == _spec_digest(spec):
+            return spec
+
+    spec = chart.to_dict()
+    digest = _spec_digest(spec)
+    if digest is not None:
+        if key not in _validated_specs:
+            weakref.finalize(chart, _validated_specs.pop, key, None)
+        _validated_specs[key] = digest
+    return spec
+
+
+def _spec_digest(spec: JSONDict) -> Optional[str]:
+    try:
+        return spec_hash(spec)
+    except TypeError:
+        return None
+
+
+def save_many(
+    items: Iterable[
+        Tuple[
+            Union[alt.TopLevelMixin, JSONDict], Optional[Union[IO, str]], Optional[str]
+        ]
+    ],
+    mode: Optional[str] = None,
+    embed_options: Optional[JSONDict] = None,
+    method: Optional[Union[str, Type[Saver]]] = None,
+    suppress_data_warning: bool = False,
+    cache: bool = False,
+    validate: bool = True,
+    executor: str = "thread",
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> Iterator[Tuple[int, Union[str, bytes, None, Exception]]]:
+    """Save many Altair, Vega, or Vega-Lite charts in parallel.
+
+    Charts are submitted to a pool of threads or processes as they are read
+    from items, with at most twice ``max_workers`` submissions outstanding. Charts for a saver with a ``save_many()`` method, such as
+    SeleniumSaver, are grouped by format and saved in batches with that method
+    (unless ``cache`` is True). Results are yielded as they complete; an error
+    in saving one chart is yielded as that chart's result, and does not abort
+    the remaining charts.
+
+    Parameters
+    ----------
+    items : iterable of (chart, fp, fmt) tuples
+        The charts to save, with the ``fp`` and ``fmt`` arguments of save()
+        for each. Either of fp or fmt may be None.
+    mode, embed_options, method, suppress_data_warning, cache, validate :
+        Options applied to every chart; see save().
+    executor : string (optional)
+        The kind of pool to save charts on: "thread" (default) or "process".
+        With "process", each fp must be a filename or None.
+    max_workers : integer (optional)
+        The size of the pool. Defaults to the default of the pool class.
+    **kwargs :
+        Additional keyword arguments are passed to Saver initialization.
+
+    Yields
+    ------
+    index : integer
+        The position of the chart within items.
+    result : string, bytes, None, or Exception
+        The return value of save() for the chart, or the exception raised
+        while saving it.
+    """
+    pool_class: Type[Executor]
+    if executor == "thread":
+        pool_class = ThreadPoolExecutor
+    elif executor == "process":
+        pool_class = ProcessPoolExecutor
+    else:
+        raise ValueError(
+            f"Unrecognized executor: {executor!r}. Must be 'thread' or 'process'."
+        )
+    if embed_options is None:
+        embed_options = alt.renderers.options.get("embed_options", None)
+    # Items are read only while few enough futures are outstanding, so that
+    # the specs of a long iterable are not all held in the pool's queue.
+    max_pending = 2 * (max_workers or os.cpu_count() or 1)
+
+    with pool_class(max_workers) as pool:
+        # The indices of the charts saved by each future.
+        futures: Dict[Future, List[int]] = {}
+        # Charts waiting to be saved together by a saver with a save_many()
+        # method, by saver class, format and mode.
+        batches: Dict[Tuple[Type[Saver], str, str], List[Tuple[int, JSONDict, Any]]]
+        batches = {}
+
+        def submit_batch(key: Tuple[Type[Saver], str, str]) -> None:
+            batch = batches.pop(key)
+            future = pool.submit(
+                _save_batch,
+                *key,
+                [spec for _, spec, _ in batch],
+                [fp for _, _, fp in batch],
+                embed_options=embed_options,
+                **kwargs,
+            )
+            futures[future] = [i for i, _, _ in batch]
+
+        warned = suppress_data_warning
+        try:
+            for i, (chart, fp, fmt) in enumerate(items):
+                try:
+                    if not warned and not isinstance(chart, dict):
+                        _check_data_transformer()
+                        warned = True
+                    spec = _chart_to_spec(chart, validate)
+                    item_mode = mode or infer_mode_from_spec(spec)
+                    saver_class = _select_saver(method, mode=item_mode, fmt=fmt, fp=fp)
+                    if fmt is None and fp is not None:
+                        fmt = extract_format(fp)
+                except Exception as err:
+                    yield i, err
+                    continue
+
+                if hasattr(saver_class, "save_many") and fmt is not None and not cache:
+                    key = (saver_class, fmt, item_mode)
+                    batches.setdefault(key, []).append((i, spec, fp))
+                    if len(batches[key]) >= _SAVE_MANY_BATCH_SIZE:
+                        submit_batch(key)
+                else:
+                    future = pool.submit(
+                        _save_single,
+                        spec,
+                        fp,
+                        fmt,
+                        mode=item_mode,
+                        embed_options=embed_options,
+                        method=saver_class,
+                        suppress_data_warning=True,
+                        cache=cache,
+                        **kwargs,
+                    )
+                    futures[future] = [i]
+
+                done = [future for future in futures if future.done()]
+                if len(futures) >= max_pending:
+                    done = list(wait(futures, return_when=FIRST_COMPLETED).done)
+                for future in done:
+                    yield from _future_results(future, futures.pop(future))
+
+            for key in list(batches):
+                submit_batch(key)
+            for future in as_completed(list(futures)):
+                yield from _future_results(future, futures.pop(future))
+        finally:
+            # If the caller stops iterating, don't save the remaining charts.
+            for future in futures:
+                future.cancel()
 
-    return saver.save(fp=fp, fmt=fmt)
+
+def _future_results(
+    future: Future, indices: List[int]
+) -> List[Tuple[int, Union[str, bytes, None, Exception]]]:
+    """Pair the results of a future from save_many() with the indices of its charts."""
+    try:
+        results = future.result()
+    except Exception as err:
+        results = [err] * len(indices)
+    return list(zip(indices, results))
+
+
+def _save_single(*args: Any, **kwargs: Any) -> List[Optional[Union[str, bytes]]]:
+    """Save a chart with save(), returning the result in a list like _save_batch()."""
+    return [save(*args, **kwargs)]
+
+
+def _save_batch(
+    saver_class: Type[Saver],
+    fmt: str,
+    mode: str,
+    specs: List[JSONDict],
+    fps: List[Optional[Union[IO, str]]],
+    **kwargs: Any,
+) -> List[Union[str, bytes, None, Exception]]:
+    """Save a batch of charts with the save_many() method of saver_class."""
+    results: List[Union[str, bytes, None, Exception]] = []
+    contents = saver_class.save_many(specs, fmt, mode=mode, **kwargs)  # type: ignore
+    for fp, content in zip(fps, contents):
+        if fp is not None and not isinstance(content, Exception):
+            try:
+                with maybe_open(fp, "wb" if isinstance(content, bytes) else "w") as f:
+                    if fmt == "vega":
+                        # Match the indentation of save().
+                        json.dump(json.loads(content), f, indent=2)
+                    else:
+                        f.write(content)
+            except Exception as err:
+                content = err
+            else:
+                content = None
+        results.append(content)
+    return results
 
 
 def render(
@@ -178,6 +544,8 @@ def render(
     mode: Optional[str] = None,
     embed_options: Optional[JSONDict] = None,
     method: Optional[Union[str, Type[Saver]]] = None,
+    cache: bool = False,
+    validate: bool = True,
     **kwargs: Any,
 ) -> Mimebundle:
     """Render a chart, returning a mimebundle.
@@ -199,6 +567,13 @@ def render(
     method : string or type
         The save method to use: one of {"node", "selenium", "html", "basic"},
         or a subclass of Saver.
+    cache : bool (optional)
+        If True, the result for each format is looked up in and stored to
+        ``altair_saver.cache.result_cache``. Default is False.
+    validate : bool (optional)
+        If False, skip validation of an Altair chart against the Vega-Lite schema.
+        Default is True; validation is skipped if the chart has not changed since it
+        was last validated.
     **kwargs :
         Additional keyword arguments are passed to Saver initialization.
 
@@ -228,6 +603,10 @@ def render(
     standalone : boolean
         For method="html", specify whether to create a standalone HTML file.
         Default is False for render().
+    deterministic_id : boolean
+        For method="html", specify whether the id of the chart's output div is derived
+        from a hash of the spec and options, so that identical input produces identical
+        output. Default is True for standalone HTML, False otherwise.
     webdriver : string or WebDriver
         For method="selenium", the type of webdriver to use: one of "chrome", "firefox",
         or a selenium.WebDriver object. Defaults to what is available on your system.
@@ -235,15 +614,152 @@ def render(
         For method="selenium", whether to save charts in offline mode (default=True). If
         false, saving charts will require a web connection to load Javascript from CDN.
     """
-    if isinstance(fmts, str):
-        fmts = [fmts]
+    savers = _get_render_savers(
+        chart, fmts, mode, embed_options, method, validate, **kwargs
+    )
     mimebundle: Mimebundle = {}
+    for saver_fmts, saver in savers:
+        if not cache:
+            mimebundle.update(saver.mimebundle(saver_fmts))
+            continue
+        keys, missing = _cached_mimebundle(saver, saver_fmts, mimebundle, kwargs)
+        if missing:
+            bundle = saver.mimebundle(missing)
+            _store_mimebundle(saver, bundle, keys)
+            mimebundle.update(bundle)
+    return mimebundle
 
-    spec: JSONDict = {}
-    if isinstance(chart, dict):
-        spec = chart
+
+async def render_async(
+    chart: Union[alt.TopLevelMixin, JSONDict],
+    fmts: Union[str, Iterable[str]],
+    mode: Optional[str] = None,
+    embed_options: Optional[JSONDict] = None,
+    method: Optional[Union[str, Type[Saver]]] = None,
+    cache: bool = False,
+    validate: bool = True,
+    **kwargs: Any,
+) -> Mimebundle:
+    """Render a chart, returning a mimebundle, without blocking the event loop.
+
+    This is the coroutine version of render(); see its documentation for a
+    description of the parameters.
+    """
+    savers = _get_render_savers(
+        chart, fmts, mode, embed_options, method, validate, **kwargs
+    )
+    mimebundle: Mimebundle = {}
+    pending: List[Tuple[Saver, List[str], Dict[str, Optional[str]]]] = []
+    for saver_fmts, saver in savers:
+        if not cache:
+            pending.append((saver, saver_fmts, {}))
+            continue
+        keys, missing = _cached_mimebundle(saver, saver_fmts, mimebundle, kwargs)
+        if missing:
+            pending.append((saver, missing, keys))
+    bundles = await asyncio.gather(
+        *(saver.mimebundle_async(saver_fmts) for saver, saver_fmts, _ in pending)
+    )
+    for (saver, _, keys), bundle in zip(pending, bundles):
+        _store_mimebundle(saver, bundle, keys)
+        mimebundle.update(bundle)
+    return mimebundle
+
+
+def _result_key(
+    saver: Saver, fmt: str, content_type: str, kwargs: Dict[str, Any]
+) -> Optional[str]:
+    """Return the result cache key of a saver output.
+
+    Returns None if the saver options are not JSON-serializable (for example,
+    a WebDriver instance), in which case the result is not cached.
+    """
+    try:
+        return spec_hash(
+            f"{type(saver).__module__}.{type(saver).__qualname__}",
+            saver._mode,
+            saver._spec,
+            saver._embed_options,
+            saver._package_versions,
+            fmt,
+            content_type,
+            kwargs,
+        )
+    except TypeError:
+        return None
+
+
+def _cached_result(key: Optional[str]) -> Optional[MimebundleContent]:
+    value = None if key is None else result_cache.get(key)
+    if value is None:
+        return None
+    # The first byte records the type of the cached content.
+    kind, data = value[:1], value[1:]
+    if kind == b"b":
+        return data
+    elif kind == b"s":
+        return data.decode()
+    return json.loads(data)
+
+
+def _store_result(key: Optional[str], content: MimebundleContent) -> None:
+    if key is None:
+        return
+    if isinstance(content, bytes):
+        value = b"b" + content
+    elif isinstance(content, str):
+        value = b"s" + content.encode()
     else:
-        spec = chart.to_dict()
+        value = b"j" + json.dumps(content).encode()
+    result_cache.set(key, value)
+
+
+def _cached_mimebundle(
+    saver: Saver, fmts: List[str], mimebundle: Mimebundle, kwargs: Dict[str, Any]
+) -> Tuple[Dict[str, Optional[str]], List[str]]:
+    """Add cached outputs of a saver to a mimebundle.
+
+    Returns the result cache keys by mimetype, and the formats not found in the cache.
+    """
+    keys: Dict[str, Optional[str]] = {}
+    missing = []
+    for fmt in fmts:
+        mimetype = saver._mimetype(fmt)
+        keys[mimetype] = _result_key(saver, fmt, "mimebundle", kwargs)
+        content = _cached_result(keys[mimetype])
+        if content is None:
+            missing.append(fmt)
+        else:
+            mimebundle[mimetype] = content
+    return keys, missing
+
+
+def _store_mimebundle(
+    saver: Saver, bundle: Mimebundle, keys: Dict[str, Optional[str]]
+) -> None:
+    for mimetype, content in bundle.items():
+        if mimetype in keys:
+            _store_result(keys[mimetype], content)
+
+
+def _get_render_savers(
+    chart: Union[alt.TopLevelMixin, JSONDict],
+    fmts: Union[str, Iterable[str]],
+    mode: Optional[str],
+    embed_options: Optional[JSONDict],
+    method: Optional[Union[str, Type[Saver]]],
+    validate: bool,
+    **kwargs: Any,
+) -> List[Tuple[List[str], Saver]]:
+    """Construct the (formats, Saver) pairs used by render().
+
+    Formats handled by the same saver class are grouped, so that each saver
+    renders all of its formats with a single mimebundle() call.
+    """
+    if isinstance(fmts, str):
+        fmts = [fmts]
+
+    spec = _chart_to_spec(chart, validate)
 
     if mode is None:
         mode = infer_mode_from_spec(spec)
@@ -251,12 +767,17 @@ def render(
     if embed_options is None:
         embed_options = alt.renderers.options.get("embed_options", None)
 
+    groups: Dict[Type[Saver], List[str]] = {}
     for fmt in fmts:
-        Saver = _select_saver(method, mode=mode, fmt=fmt)
-        saver = Saver(spec, mode=mode, embed_options=embed_options, **kwargs)
-        mimebundle.update(saver.mimebundle(fmt))
-
-    return mimebundle
+        saver_class = _select_saver(method, mode=mode, fmt=fmt)
+        groups.setdefault(saver_class, []).append(fmt)
+    return [
+        (
+            saver_fmts,
+            saver_class(spec, mode=mode, embed_options=embed_options, **kwargs),
+        )
+        for saver_class, saver_fmts in groups.items()
+    ]
 
 
 def available_formats(mode: str = "vega-lite") -> Set[str]:
@@ -276,5 +797,9 @@ def available_formats(mode: str = "vega-lite") -> Set[str]:
     if mode not in valid_modes:
         raise ValueError(f"Invalid mode: {mode!r}. Must be one of {valid_modes!r}")
     return set.union(
-        *(set(s.valid_formats[mode]) for s in _SAVER_METHODS.values() if s.enabled())
+        *(
+            set(s.valid_formats[mode])
+            for s in map(_saver_class, _SAVER_METHODS)
+            if s.enabled()
+        )
     )
@@ -1,17 +1,33 @@
+import asyncio
 import contextlib
+import functools
 from http import client
 import io
 import os
+import shutil
 import socket
 import subprocess
 import sys
 import tempfile
+import threading
+import uuid
 from typing import Callable, IO, Iterator, List, Optional, Union
 
 import altair as alt
 
 from altair_saver.types import JSONDict
 
+# Size of chunks in which subprocess output is copied to files.
+CHUNK_SIZE = 2 ** 16
+
+
+@functools.lru_cache(16)
+def get_bundled_script(package: str, version: str) -> str:
+    """Get the bundled javascript of a package, memoized for the process."""
+    from altair_viewer import get_bundled_script
+
+    return get_bundled_script(package, version)
+
 
 def internet_connected(test_url: str = "cdn.jsdelivr.net") -> bool:
     """Return True if web connection is available."""
@@ -150,6 +166,23 @@ def maybe_open(fp: Union[IO, str], mode: str = "w") -> Iterator[IO]:
         yield fp
 
 
+@contextlib.contextmanager
+def atomic_open(filename: str, mode: str = "w") -> Iterator[IO]:
+    """Context manager to write a file that is replaced only on success.
+
+    Output is written to a temporary file in the same directory, which is moved
+    onto ``filename`` when the context exits without error, and removed otherwise.
+    """
+    tmp = f"{filename}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, mode.replace("w", "x")) as f:
+            yield f
+        os.replace(tmp, filename)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
 def extract_format(fp: Union[IO, str]) -> str:
     """Extract the altair_saver output format from a file or filename."""
     filename: Optional[str]
@@ -210,11 +243,151 @@ def check_output_with_stderr(
         stderr = ps.stderr
         return ps.stdout
     finally:
-        s = stderr.decode()
-        if stderr_filter:
-            s = "\n".join(filter(stderr_filter, s.splitlines()))
-        if s:
-            if not s.endswith("\n"):
-                s += "\n"
-            sys.stderr.write(s)
-            sys.stderr.flush()
+        write_stderr(stderr.decode(), stderr_filter=stderr_filter)
+
+
+async def check_output_with_stderr_async(
+    cmd: List[str],
+    input: Optional[bytes] = None,
+    stderr_filter: Optional[Callable[[str], bool]] = None,
+) -> bytes:
+    """Coroutine version of check_output_with_stderr().
+
+    The command is run with asyncio.create_subprocess_exec(), so that the event
+    loop is not blocked while it executes.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await proc.communicate(input)
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    write_stderr(stderr.decode(), stderr_filter=stderr_filter)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode, cmd, output=stdout, stderr=stderr
+        )
+    return stdout
+
+
+def check_pipeline_with_stderr(
+    cmds: List[List[str]],
+    input: Optional[bytes] = None,
+    stderr_filter: Optional[Callable[[str], bool]] = None,
+    out: Optional[IO[bytes]] = None,
+) -> bytes:
+    """Run a pipeline of commands, printing stderr to sys.stderr.
+
+    The stdout of each command is connected to the stdin of the next with an
+    OS pipe, so intermediate outputs are never read into Python. Lines of stderr
+    are printed as they arrive.
+
+    Parameters
+    ----------
+    cmds : list of lists of strings
+        The commands in the pipeline.
+    input : bytes (optional)
+        The input to the first command.
+    stderr_filter : function(str)->bool (optional)
+        If provided, this function is used to filter stderr lines from display.
+    out : file-like object (optional)
+        If provided, the stdout from the last command is copied to this binary
+        file in chunks, rather than being returned.
+
+    Returns
+    -------
+    result : bytes
+        The stdout from the last command, or empty bytes if ``out`` is specified.
+
+    Raises
+    ------
+    subprocess.CalledProcessError : if any called process returns a non-zero exit code.
+    """
+    procs: List["subprocess.Popen[bytes]"] = []
+    stderrs: List[List[bytes]] = [[] for cmd in cmds]
+
+    def read_stderr(i: int) -> None:
+        stream = procs[i].stderr
+        assert stream is not None
+        for line in iter(stream.readline, b""):
+            stderrs[i].append(line)
+            write_stderr(line.decode(), stderr_filter=stderr_filter)
+
+    def write_input() -> None:
+        stream = procs[0].stdin
+        assert stream is not None
+        try:
+            if input:
+                stream.write(input)
+        except BrokenPipeError:
+            pass
+        finally:
+            stream.close()
+
+    try:
+        for cmd in cmds:
+            stdin = procs[-1].stdout if procs else subprocess.PIPE
+            procs.append(
+                subprocess.Popen(
+                    cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+            )
+            if stdin is not subprocess.PIPE:
+                # Let the previous command receive SIGPIPE if this one exits early.
+                stdin.close()  # type: ignore
+
+        threads = [threading.Thread(target=write_input)]
+        threads += [
+            threading.Thread(target=read_stderr, args=(i,)) for i in range(len(procs))
+        ]
+        for thread in threads:
+            thread.start()
+        stdout = procs[-1].stdout
+        assert stdout is not None
+        if out is None:
+            output = stdout.read()
+        else:
+            output = b""
+            shutil.copyfileobj(stdout, out, CHUNK_SIZE)
+        stdout.close()
+        for proc in procs:
+            proc.wait()
+        for thread in threads:
+            thread.join()
+        for cmd, proc, stderr in zip(cmds, procs, stderrs):
+            if proc.returncode:
+                raise subprocess.CalledProcessError(
+                    proc.returncode, cmd, output=output, stderr=b"".join(stderr)
+                )
+        return output
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+
+
+def write_stderr(s: str, stderr_filter: Optional[Callable[[str], bool]] = None) -> None:
+    """Write process output to sys.stderr, optionally filtering lines.
+
+    Parameters
+    ----------
+    s : string
+        The output to write.
+    stderr_filter : function(str)->bool (optional)
+        If provided, this function is used to filter stderr lines from display.
+    """
+    if stderr_filter:
+        s = "\n".join(filter(stderr_filter, s.splitlines()))
+    if s:
+        if not s.endswith("\n"):
+            s += "\n"
+        sys.stderr.write(s)
+        sys.stderr.flush()
@@ -0,0 +1,265 @@
+"""Caches for compiled and rendered chart outputs.
+
+Cached values are bytes, stored under string keys built with :func:`spec_hash`.
+Each cache has an in-memory LRU tier and an optional size-bounded on-disk tier
+that can be shared between processes::
+
+    from altair_saver.cache import compile_cache
+    compile_cache.configure(directory="~/.cache/altair_saver", max_bytes=2 ** 28)
+
+``result_cache`` holds the outputs of ``save(..., cache=True)`` and
+``render(..., cache=True)``.
+"""
+__all__ = [
+    "compile_cache",
+    "compile_cache_key",
+    "result_cache",
+    "spec_hash",
+    "DiskCache",
+    "LRUCache",
+    "TieredCache",
+]
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def spec_hash(*parts: Any) -> str:
+    """Return a canonical hash of JSON-serializable parts, suitable as a cache key."""
+    content = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class LRUCache:
+    """A thread-safe in-memory least-recently-used cache.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries to keep.
+    """
+
+    maxsize: int
+    hits: int
+    misses: int
+    _data: "OrderedDict[str, bytes]"
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """An on-disk least-recently-used cache, bounded by total size in bytes.
+
+    Entries are stored one per file, and file modification times track recency
+    of use. Writes are atomic, so a directory may be shared between processes.
+
+    Parameters
+    ----------
+    directory : string
+        The directory in which to store entries.
+    max_bytes : int
+        The maximum total size of stored entries.
+    """
+
+    directory: str
+    max_bytes: int
+    hits: int
+    misses: int
+    _size: Optional[int]
+
+    def __init__(self, directory: str, max_bytes: int = 2 ** 28) -> None:
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.startswith("."):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(value)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+class TieredCache:
+    """A cache with an in-memory LRU tier and an optional on-disk tier.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries in the in-memory tier.
+    directory : string (optional)
+        If specified, the directory of the on-disk tier.
+    max_bytes : int
+        The maximum total size of the on-disk tier.
+    """
+
+    memory: LRUCache
+    disk: Optional[DiskCache]
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        directory: Optional[str] = None,
+        max_bytes: int = 2 ** 28,
+    ) -> None:
+        self.memory = LRUCache(maxsize)
+        self.disk = None
+        self.configure(directory=directory, max_bytes=max_bytes)
+
+    def configure(
+        self,
+        maxsize: Optional[int] = None,
+        directory: Optional[str] = None,
+        max_bytes: int = 2 ** 28,
+    ) -> None:
+        """Configure the cache tiers.
+
+        Parameters
+        ----------
+        maxsize : int (optional)
+            If specified, the maximum number of entries in the in-memory tier.
+        directory : string (optional)
+            The directory of the on-disk tier. If None, the on-disk tier is disabled.
+        max_bytes : int
+            The maximum total size of the on-disk tier.
+        """
+        if maxsize is not None:
+            self.memory.maxsize = maxsize
+        self.disk = None if directory is None else DiskCache(directory, max_bytes)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counts of the cache tiers."""
+        stats = {"hits": self.memory.hits, "misses": self.memory.misses}
+        if self.disk is not None:
+            stats["disk_hits"] = self.disk.hits
+            stats["disk_misses"] = self.disk.misses
+        return stats
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+# Cache of Vega specs compiled from Vega-Lite, shared by all savers.
+compile_cache = TieredCache(maxsize=256)
+
+# Cache of save() and render() outputs, used when called with cache=True.
+result_cache = TieredCache(maxsize=128)
+
+
+def compile_cache_key(spec: Any, vegalite_version: str) -> str:
+    """Return the compile cache key of a Vega-Lite spec."""
+    return spec_hash(spec, {"vega-lite": vegalite_version})
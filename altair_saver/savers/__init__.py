@@ -1,8 +1,10 @@
+import importlib
+import sys
+from typing import Any
+
 from altair_saver.savers._saver import Saver
 from altair_saver.savers._basic import BasicSaver
-from altair_saver.savers._html import HTMLSaver
 from altair_saver.savers._node import NodeSaver
-from altair_saver.savers._selenium import SeleniumSaver, JavascriptError
 
 __all__ = [
     "Saver",
@@ -12,3 +14,22 @@ __all__ = [
     "SeleniumSaver",
     "JavascriptError",
 ]
+
+# Savers with heavy dependencies (selenium, altair_data_server, altair_viewer)
+# are imported on first access, by module.
+_LAZY_ATTRIBUTES = {
+    "HTMLSaver": "altair_saver.savers._html",
+    "SeleniumSaver": "altair_saver.savers._selenium",
+    "JavascriptError": "altair_saver.savers._selenium",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if sys.version_info < (3, 7):  # Module __getattr__ requires Python 3.7.
+    from altair_saver.savers._html import HTMLSaver  # noqa: F401
+    from altair_saver.savers._selenium import SeleniumSaver, JavascriptError  # noqa
@@ -1,14 +1,16 @@
 """An HTML altair saver"""
+import functools
 import json
 from typing import Any, Dict, List, Optional
 import uuid
 import warnings
 
 import altair as alt
-from altair_viewer import get_bundled_script
 
+from altair_saver.cache import spec_hash
 from altair_saver.types import JSONDict, MimebundleContent
 from altair_saver.savers import Saver
+from altair_saver._utils import get_bundled_script
 
 # This is the basic HTML template for embedding charts on a page.
 HTML_TEMPLATE = """
@@ -109,6 +111,24 @@ RENDERER_HTML_TEMPLATE = """
 
 CDN_URL = "https://cdn.jsdelivr.net/npm/{package}@{version}"
 
+# The inline template is split into the header, holding the bundled scripts,
+# and the chart body, so that the header can be formatted once per version.
+_INLINE_HTML_SPLIT = INLINE_HTML_TEMPLATE.index("<body>")
+
+
+@functools.lru_cache(16)
+def _inline_html_header(
+    vega_version: str, vegalite_version: str, vegaembed_version: str
+) -> str:
+    return INLINE_HTML_TEMPLATE[:_INLINE_HTML_SPLIT].format(
+        vega_version=vega_version,
+        vegalite_version=vegalite_version,
+        vegaembed_version=vegaembed_version,
+        vega_script=get_bundled_script("vega", vega_version),
+        vegalite_script=get_bundled_script("vega-lite", vegalite_version),
+        vegaembed_script=get_bundled_script("vega-embed", vegaembed_version),
+    )
+
 
 class HTMLSaver(Saver):
     """Basic chart output."""
@@ -116,6 +136,7 @@ class HTMLSaver(Saver):
     valid_formats: Dict[str, List[str]] = {"vega": ["html"], "vega-lite": ["html"]}
     _inline: bool
     _standalone: Optional[bool]
+    _deterministic_id: Optional[bool]
 
     def __init__(
         self,
@@ -127,10 +148,12 @@ class HTMLSaver(Saver):
         vegaembed_version: str = alt.VEGAEMBED_VERSION,
         inline: bool = False,
         standalone: Optional[bool] = None,
+        deterministic_id: Optional[bool] = None,
         **kwargs: Any,
     ) -> None:
         self._inline = inline
         self._standalone = standalone
+        self._deterministic_id = deterministic_id
         super().__init__(
             spec=spec,
             mode=mode,
@@ -149,7 +172,25 @@ class HTMLSaver(Saver):
         if standalone is None:
             standalone = content_type == "save"
 
-        output_div = f"vega-visualization-{uuid.uuid4().hex}"
+        # Fragments may be embedded several times in one page, where a shared
+        # id would collide, so only standalone documents default to stable ids.
+        deterministic_id = self._deterministic_id
+        if deterministic_id is None:
+            deterministic_id = standalone
+
+        if deterministic_id:
+            # Derive the id from the input, so that identical charts produce
+            # byte-identical output.
+            div_hash = spec_hash(
+                self._spec,
+                self._embed_options,
+                self._package_versions,
+                self._inline,
+                standalone,
+            )[:32]
+        else:
+            div_hash = uuid.uuid4().hex
+        output_div = f"vega-visualization-{div_hash}"
 
         if not standalone:
             if self._inline:
@@ -163,19 +204,14 @@ class HTMLSaver(Saver):
                 output_div=output_div,
             )
         elif self._inline:
-            return INLINE_HTML_TEMPLATE.format(
+            header = _inline_html_header(
+                self._package_versions["vega"],
+                self._package_versions["vega-lite"],
+                self._package_versions["vega-embed"],
+            )
+            return header + INLINE_HTML_TEMPLATE[_INLINE_HTML_SPLIT:].format(
                 spec=json.dumps(self._spec),
                 embed_options=json.dumps(self._embed_options),
-                vega_version=self._package_versions["vega"],
-                vegalite_version=self._package_versions["vega-lite"],
-                vegaembed_version=self._package_versions["vega-embed"],
-                vega_script=get_bundled_script("vega", self._package_versions["vega"]),
-                vegalite_script=get_bundled_script(
-                    "vega-lite", self._package_versions["vega-lite"]
-                ),
-                vegaembed_script=get_bundled_script(
-                    "vega-embed", self._package_versions["vega-embed"]
-                ),
                 output_div=output_div,
             )
         else:
@@ -1,11 +1,22 @@
+import atexit
 import functools
 import json
+import os
 import shutil
-from typing import Any, Callable, Dict, List, Optional
+import subprocess
+import threading
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Union
 
-from altair_saver.types import JSONDict, MimebundleContent
-from altair_saver._utils import check_output_with_stderr
+from altair_saver.cache import compile_cache, compile_cache_key
+from altair_saver.types import JSONDict, Mimebundle, MimebundleContent
+from altair_saver._utils import (
+    check_output_with_stderr,
+    check_output_with_stderr_async,
+    check_pipeline_with_stderr,
+    temporary_filename,
+)
 from altair_saver.savers import Saver
+from altair_saver.savers._node_worker import NodeWorkerError, NodeWorkerPool
 
 
 class ExecutableNotFound(RuntimeError):
@@ -24,27 +35,150 @@ def npm_bin(global_: bool) -> str:
     return check_output_with_stderr(cmd).decode().strip()
 
 
+# If set, the vega executables are looked up only in this directory (or list of
+# directories separated by os.pathsep), skipping all other discovery.
+EXEC_PATH_ENV = "ALTAIR_SAVER_NODE_BIN"
+
+
+def _exec_cache_file() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(
+        os.path.expanduser(cache_home), "altair_saver", "exec_paths.json"
+    )
+
+
+def _load_exec_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(_exec_cache_file()) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _cached_exec_path(name: str) -> Optional[str]:
+    """Look up an executable path found by a previous process.
+
+    Entries are invalidated if the executable's modification time has changed.
+    """
+    entry = _load_exec_cache().get(name)
+    if not isinstance(entry, dict):
+        return None
+    path = entry.get("path")
+    try:
+        if not isinstance(path, str) or os.stat(path).st_mtime != entry.get("mtime"):
+            return None
+    except OSError:
+        return None
+    return path if os.access(path, os.X_OK) else None
+
+
+def _store_exec_path(name: str, path: str) -> None:
+    cache = _load_exec_cache()
+    cache[name] = {"path": path, "mtime": os.stat(path).st_mtime}
+    filename = _exec_cache_file()
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with temporary_filename(dir=os.path.dirname(filename)) as tmp:
+            with open(tmp, "w") as f:
+                json.dump(cache, f)
+            os.replace(tmp, filename)
+    except OSError:
+        pass
+
+
 @functools.lru_cache(16)
 def exec_path(name: str) -> str:
-    for path in [None, npm_bin(global_=True), npm_bin(global_=False)]:
+    """Locate a vega executable.
+
+    The executable is searched for in the directories specified by the
+    ALTAIR_SAVER_NODE_BIN environment variable if it is set. Otherwise it is
+    searched for on the system PATH, then among paths found in the global npm
+    bin directory by previous processes, and finally in the global and local
+    npm bin directories.
+    """
+    override = os.environ.get(EXEC_PATH_ENV)
+    if override is not None:
+        exc = shutil.which(name, path=override)
+        if exc:
+            return exc
+        raise ExecutableNotFound(name)
+
+    exc = shutil.which(name) or _cached_exec_path(name)
+    if exc:
+        return exc
+
+    for global_ in [True, False]:
+        try:
+            path = npm_bin(global_=global_)
+        except (ExecutableNotFound, subprocess.CalledProcessError):
+            continue
         exc = shutil.which(name, path=path)
         if exc:
+            # The local bin directory depends on the working directory, so
+            # only paths in the global one are shared with other processes.
+            if global_:
+                _store_exec_path(name, exc)
             return exc
     raise ExecutableNotFound(name)
 
 
+def _package_dir(name: str) -> str:
+    """Locate the npm package directory containing the named executable."""
+    # npm installs executables as symlinks to <package>/bin/<name>.
+    return os.path.dirname(os.path.dirname(os.path.realpath(exec_path(name))))
+
+
+@functools.lru_cache(16)
+def _vegalite_version(vl2vg: str) -> str:
+    """Return the version of the vega-lite package providing a vl2vg executable.
+
+    If the version cannot be read, an identifier of the executable is returned
+    instead, so that its output is not confused with that of a known version.
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.realpath(vl2vg)))
+    try:
+        with open(os.path.join(package_dir, "package.json")) as f:
+            version = json.load(f)["version"]
+    except (OSError, ValueError, KeyError, TypeError):
+        version = None
+    return version if isinstance(version, str) else f"node:{vl2vg}"
+
+
 def _default_stderr_filter(line: str) -> bool:
     return line != "WARN Can not resolve event source: window"
 
 
 class NodeSaver(Saver):
+    """Save charts using the vega & vega-lite node packages.
+
+    By default, charts are rendered by a pool of persistent node worker processes
+    that keep the javascript libraries loaded between calls; concurrent saves from
+    multiple threads are spread across the workers. The pool is configured via the
+    ``worker_pool_size`` and ``worker_max_requests`` class attributes.
+
+    The command-line tools are used instead if ``use_worker=False``, if
+    ``vega_cli_options`` are specified, or if the workers cannot be started.
+    """
 
     valid_formats: Dict[str, List[str]] = {
         "vega": ["pdf", "png", "svg"],
         "vega-lite": ["pdf", "png", "svg", "vega"],
     }
+    streaming_formats: List[str] = ["pdf", "png"]
     _vega_cli_options: List[str]
     _stderr_filter: Optional[Callable[[str], bool]]
+    _use_worker: bool
+    _vg_json: Optional[bytes]
+    _vg_spec: Optional[JSONDict]
+
+    # Configuration of the shared worker pool; see NodeWorkerPool.
+    worker_pool_size: Optional[int] = None
+    worker_max_requests: Optional[int] = 1000
+
+    _pool: Optional[NodeWorkerPool] = None
+    _pool_lock: threading.Lock = threading.Lock()
+    _pool_unavailable: bool = False
 
     def __init__(
         self,
@@ -52,51 +186,185 @@ class NodeSaver(Saver):
         mode: Optional[str] = None,
         vega_cli_options: Optional[List[str]] = None,
         stderr_filter: Optional[Callable[[str], bool]] = _default_stderr_filter,
+        use_worker: bool = True,
         **kwargs: Any,
     ) -> None:
         self._vega_cli_options = vega_cli_options or []
         self._stderr_filter = stderr_filter
+        self._use_worker = use_worker
+        self._vg_json = None
+        self._vg_spec = None
         super().__init__(spec=spec, mode=mode, **kwargs)
 
-    def _vl2vg(self, spec: JSONDict) -> JSONDict:
-        """Compile a Vega-Lite spec into a Vega spec."""
+    @classmethod
+    def _get_pool(cls) -> Optional[NodeWorkerPool]:
+        """Get the shared pool of node workers, starting it if necessary.
+
+        Returns None if the workers cannot be started on this system.
+        """
+        with cls._pool_lock:
+            if cls._pool_unavailable:
+                return None
+            if cls._pool is None:
+                node = shutil.which("node")
+                try:
+                    if not node:
+                        raise ExecutableNotFound("node")
+                    pool = NodeWorkerPool(
+                        node,
+                        [_package_dir("vl2vg"), _package_dir("vg2png")],
+                        size=cls.worker_pool_size,
+                        max_requests=cls.worker_max_requests,
+                    )
+                    pool.start()
+                except (ExecutableNotFound, NodeWorkerError, OSError):
+                    cls._pool_unavailable = True
+                    return None
+                atexit.register(pool.stop)
+                cls._pool = pool
+            return cls._pool
+
+    @classmethod
+    def _stop_pool(cls) -> None:
+        with cls._pool_lock:
+            if cls._pool is not None:
+                cls._pool.stop()
+                cls._pool = None
+
+    def _use_pool(self) -> bool:
+        return self._use_worker and not self._vega_cli_options
+
+    def _vl2vg(self, vl_json: bytes) -> bytes:
+        """Compile a JSON-encoded Vega-Lite spec into a JSON-encoded Vega spec."""
         vl2vg = exec_path("vl2vg")
-        vl_json = json.dumps(spec).encode()
-        vg_json = check_output_with_stderr(
+        return check_output_with_stderr(
             [vl2vg], input=vl_json, stderr_filter=self._stderr_filter
         )
-        return json.loads(vg_json)
 
-    def _vg2png(self, spec: JSONDict) -> bytes:
-        """Generate a PNG image from a Vega spec."""
+    def _vg2png(self, vg_json: bytes) -> bytes:
+        """Generate a PNG image from a JSON-encoded Vega spec."""
         vg2png = exec_path("vg2png")
-        vg_json = json.dumps(spec).encode()
         return check_output_with_stderr(
             [vg2png, *(self._vega_cli_options or [])],
             input=vg_json,
             stderr_filter=self._stderr_filter,
         )
 
-    def _vg2pdf(self, spec: JSONDict) -> bytes:
-        """Generate a PDF image from a Vega spec."""
+    def _vg2pdf(self, vg_json: bytes) -> bytes:
+        """Generate a PDF image from a JSON-encoded Vega spec."""
         vg2pdf = exec_path("vg2pdf")
-        vg_json = json.dumps(spec).encode()
         return check_output_with_stderr(
             [vg2pdf, *(self._vega_cli_options or [])],
             input=vg_json,
             stderr_filter=self._stderr_filter,
         )
 
-    def _vg2svg(self, spec: JSONDict) -> str:
-        """Generate an SVG image from a Vega spec."""
+    def _vg2svg(self, vg_json: bytes) -> str:
+        """Generate an SVG image from a JSON-encoded Vega spec."""
         vg2svg = exec_path("vg2svg")
-        vg_json = json.dumps(spec).encode()
         return check_output_with_stderr(
             [vg2svg, *(self._vega_cli_options or [])],
             input=vg_json,
             stderr_filter=self._stderr_filter,
         ).decode()
 
+    def _render_cli(self, fmt: str, out: Optional[IO[bytes]] = None) -> bytes:
+        """Generate an image with the vega command-line tools.
+
+        If the compiled Vega spec is not yet available, vl2vg is piped directly
+        into the renderer, so that the intermediate spec is never read into
+        Python. If ``out`` is specified, the image is copied to it in chunks.
+        """
+        render = [exec_path(f"vg2{fmt}"), *(self._vega_cli_options or [])]
+        vg_json = self._cached_vega_json()
+        if vg_json is None:
+            cmds = [[exec_path("vl2vg")], render]
+            spec_json = json.dumps(self._spec).encode()
+        else:
+            cmds = [render]
+            spec_json = vg_json
+        return check_pipeline_with_stderr(
+            cmds, input=spec_json, stderr_filter=self._stderr_filter, out=out
+        )
+
+    def _compile_cache_key(self) -> str:
+        # Specs are compiled by the installed vega-lite package, whatever the
+        # vegalite_version of the saver.
+        return compile_cache_key(self._spec, _vegalite_version(exec_path("vl2vg")))
+
+    def _cached_vega_json(self) -> Optional[bytes]:
+        """Return the JSON-encoded Vega spec if it is available without compiling."""
+        if self._vg_json is None:
+            if self._mode == "vega":
+                self._vg_json = json.dumps(self._spec).encode()
+            else:
+                self._vg_json = compile_cache.get(self._compile_cache_key())
+        return self._vg_json
+
+    def _vega_json(self, pool: Optional[NodeWorkerPool]) -> bytes:
+        """Return the JSON-encoded Vega spec, compiling it if necessary.
+
+        The result is memoized, so that all formats in a mimebundle are
+        produced from a single compile of the spec.
+        """
+        vg_json = self._cached_vega_json()
+        if vg_json is None:
+            vl_json = json.dumps(self._spec).encode()
+            if pool is not None:
+                vg_json = pool.request(
+                    vl_json, "vega-lite", "vega", self._stderr_filter
+                )
+            else:
+                vg_json = self._vl2vg(vl_json)
+            compile_cache.set(self._compile_cache_key(), vg_json)
+            self._vg_json = vg_json
+        return vg_json
+
+    async def _vega_json_async(self) -> bytes:
+        """Coroutine version of _vega_json(), using the command-line tools."""
+        vg_json = self._cached_vega_json()
+        if vg_json is None:
+            vg_json = await check_output_with_stderr_async(
+                [exec_path("vl2vg")],
+                input=json.dumps(self._spec).encode(),
+                stderr_filter=self._stderr_filter,
+            )
+            compile_cache.set(self._compile_cache_key(), vg_json)
+            self._vg_json = vg_json
+        return vg_json
+
+    async def mimebundle_async(self, fmts: Union[str, Iterable[str]]) -> Mimebundle:
+        # Compile the spec before the formats are rendered concurrently, so
+        # that they share a single compile.
+        await self._vega_json_async()
+        return await super().mimebundle_async(fmts)
+
+    async def _serialize_async(self, fmt: str, content_type: str) -> MimebundleContent:
+        # Run the command-line tools as asyncio subprocesses, so that many
+        # renders can be in flight without blocking the event loop.
+        vg_json = await self._vega_json_async()
+
+        if fmt == "vega":
+            if self._vg_spec is None:
+                self._vg_spec = json.loads(vg_json)
+            return self._vg_spec
+        elif fmt not in ["png", "svg", "pdf"]:
+            raise ValueError(f"Unrecognized format: {fmt!r}")
+        out = await check_output_with_stderr_async(
+            [exec_path(f"vg2{fmt}"), *(self._vega_cli_options or [])],
+            input=vg_json,
+            stderr_filter=self._stderr_filter,
+        )
+        return out.decode() if fmt == "svg" else out
+
+    def _serialize_to(self, fmt: str, fp: IO[bytes]) -> None:
+        pool = self._get_pool() if self._use_pool() else None
+        if pool is None:
+            self._render_cli(fmt, out=fp)
+        else:
+            vg_json = self._vega_json(pool)
+            pool.request(vg_json, "vega", fmt, self._stderr_filter, out=fp)
+
     @classmethod
     def enabled(cls) -> bool:
         try:
@@ -108,18 +376,28 @@ class NodeSaver(Saver):
         if self._mode not in ["vega", "vega-lite"]:
             raise ValueError("mode must be either 'vega' or 'vega-lite'")
 
-        spec = self._spec
+        pool = self._get_pool() if self._use_pool() else None
 
-        if self._mode == "vega-lite":
-            spec = self._vl2vg(spec)
+        if pool is None and content_type == "save" and fmt in ["png", "svg", "pdf"]:
+            # A single image from the command-line tools: avoid reading the
+            # intermediate Vega spec into Python.
+            out = self._render_cli(fmt)
+            return out.decode() if fmt == "svg" else out
+
+        vg_json = self._vega_json(pool)
 
         if fmt == "vega":
-            return spec
+            if self._vg_spec is None:
+                self._vg_spec = json.loads(vg_json)
+            return self._vg_spec
+        elif fmt not in ["png", "svg", "pdf"]:
+            raise ValueError(f"Unrecognized format: {fmt!r}")
+        elif pool is not None:
+            out = pool.request(vg_json, "vega", fmt, self._stderr_filter)
+            return out.decode() if fmt == "svg" else out
         elif fmt == "png":
-            return self._vg2png(spec)
+            return self._vg2png(vg_json)
         elif fmt == "svg":
-            return self._vg2svg(spec)
-        elif fmt == "pdf":
-            return self._vg2pdf(spec)
+            return self._vg2svg(vg_json)
         else:
-            raise ValueError(f"Unrecognized format: {fmt!r}")
+            return self._vg2pdf(vg_json)
@@ -0,0 +1,121 @@
+// Persistent rendering worker for altair_saver's NodeSaver.
+//
+// Usage: node _node_worker.js <vega-lite package dir> <vega-cli package dir>
+//
+// Messages are exchanged over stdin/stdout as frames: a 4-byte big-endian
+// length followed by that many bytes. Each request consists of a JSON header
+// frame ({"mode": ..., "fmt": ...}) followed by a frame containing the input
+// spec. Each response consists of a JSON header frame ({"ok": ..., "log": [...]})
+// followed by a frame containing the output. On startup, the worker sends a
+// single response indicating whether the required packages could be loaded.
+"use strict";
+
+const path = require("path");
+const { createRequire } = require("module");
+
+// stdout is reserved for the protocol: collect console output and send it
+// back to the caller along with each response.
+let log = [];
+for (const method of ["log", "info", "warn", "error", "debug"]) {
+  console[method] = (...args) => log.push(args.join(" "));
+}
+
+function writeFrame(data) {
+  const length = Buffer.alloc(4);
+  length.writeUInt32BE(data.length, 0);
+  process.stdout.write(length);
+  process.stdout.write(data);
+}
+
+function respond(header, body) {
+  header.log = log;
+  log = [];
+  writeFrame(Buffer.from(JSON.stringify(header)));
+  writeFrame(body || Buffer.alloc(0));
+}
+
+function load(packageDir, name) {
+  return createRequire(path.join(packageDir, "package.json"))(name);
+}
+
+let vega, vegaLite;
+try {
+  const [vegaliteDir, vegacliDir] = process.argv.slice(2);
+  vegaLite = load(vegaliteDir, "vega-lite");
+  vega = load(vegacliDir, "vega");
+} catch (err) {
+  respond({ ok: false, error: err.toString() });
+  process.exit(1);
+}
+
+async function render(header, body) {
+  let spec = JSON.parse(body.toString("utf8"));
+  if (header.mode === "vega-lite") {
+    spec = vegaLite.compile(spec).spec;
+  }
+  if (header.fmt === "vega") {
+    return Buffer.from(JSON.stringify(spec));
+  }
+  const view = new vega.View(vega.parse(spec), {
+    loader: vega.loader(),
+    logger: vega.logger(vega.Warn, "error"),
+    renderer: "none",
+  }).finalize();
+  if (header.fmt === "svg") {
+    return Buffer.from(await view.toSVG());
+  } else if (header.fmt === "png") {
+    const canvas = await view.toCanvas();
+    return canvas.toBuffer("image/png");
+  } else if (header.fmt === "pdf") {
+    const canvas = await view.toCanvas(undefined, {
+      type: "pdf",
+      context: { textDrawingMode: "glyph" },
+    });
+    return canvas.toBuffer();
+  }
+  throw new Error("Unrecognized format: " + header.fmt);
+}
+
+// Input received but not yet parsed into frames. Chunks are only joined once
+// a full frame has arrived, so that large requests are not copied repeatedly.
+let chunks = [];
+let buffered = 0;
+let pending = [];
+let queue = Promise.resolve();
+
+function handle(header, body) {
+  queue = queue
+    .then(() => render(header, body))
+    .then(
+      (result) => respond({ ok: true }, result),
+      (err) => respond({ ok: false, error: err.toString() })
+    );
+}
+
+process.stdin.on("data", (chunk) => {
+  chunks.push(chunk);
+  buffered += chunk.length;
+  while (buffered >= 4) {
+    if (chunks[0].length < 4) {
+      chunks = [Buffer.concat(chunks, buffered)];
+    }
+    const length = chunks[0].readUInt32BE(0);
+    if (buffered < 4 + length) {
+      break;
+    }
+    const data = chunks.length === 1 ? chunks[0] : Buffer.concat(chunks, buffered);
+    pending.push(data.slice(4, 4 + length));
+    const rest = data.slice(4 + length);
+    chunks = rest.length ? [rest] : [];
+    buffered = rest.length;
+    if (pending.length === 2) {
+      const [header, body] = pending;
+      pending = [];
+      handle(JSON.parse(header.toString("utf8")), body);
+    }
+  }
+});
+
+process.stdin.on("end", () => queue.then(() => process.exit(0)));
+
+respond({ ok: true });
@@ -0,0 +1,324 @@
+"""A persistent NodeJS process for compiling and rendering charts."""
+import json
+import os
+import queue
+import struct
+import subprocess
+import threading
+from typing import Callable, IO, List, Optional, Tuple
+
+from altair_saver.types import JSONDict
+from altair_saver._utils import CHUNK_SIZE, write_stderr
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "_node_worker.js")
+
+_LENGTH = struct.Struct(">I")
+
+
+class NodeWorkerError(subprocess.CalledProcessError):
+    """Raised when the node worker fails to produce an output.
+
+    This is a CalledProcessError, as raised by the command-line tools, so that
+    callers can handle failures of either alike. The error message from the
+    worker is available as ``stderr``.
+    """
+
+    def __init__(self, message: str) -> None:
+        super().__init__(1, "node", stderr=message.encode())
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class NodeWorkerCrashed(NodeWorkerError):
+    """Raised when the node worker process exits unexpectedly."""
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise EOFError("node worker closed its output stream")
+    return data
+
+
+def _read_frame(stream: IO[bytes]) -> bytes:
+    (length,) = _LENGTH.unpack(_read_exactly(stream, _LENGTH.size))
+    return _read_exactly(stream, length)
+
+
+def _copy_frame(stream: IO[bytes], out: IO[bytes]) -> None:
+    (length,) = _LENGTH.unpack(_read_exactly(stream, _LENGTH.size))
+    while length:
+        chunk = _read_exactly(stream, min(length, CHUNK_SIZE))
+        out.write(chunk)
+        length -= len(chunk)
+
+
+def _write_frame(stream: IO[bytes], data: bytes) -> None:
+    stream.write(_LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+class NodeWorker:
+    """A long-lived node process serving compile and render requests.
+
+    The worker loads vega and vega-lite once at startup, and then serves
+    requests over a framed protocol on stdin/stdout (see _node_worker.js).
+    Requests are serialized: a single worker handles one request at a time.
+
+    Parameters
+    ----------
+    node : string
+        Path to the node executable.
+    package_dirs : list of strings
+        The vega-lite and vega-cli package directories, from which the
+        javascript dependencies are loaded.
+    """
+
+    _node: str
+    _package_dirs: List[str]
+    _proc: Optional["subprocess.Popen[bytes]"]
+    requests: int
+
+    def __init__(self, node: str, package_dirs: List[str]) -> None:
+        self._node = node
+        self._package_dirs = package_dirs
+        self._proc = None
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> None:
+        """Start the worker process, if it is not already running.
+
+        Raises
+        ------
+        NodeWorkerError : if the worker cannot load its dependencies.
+        """
+        if self.alive:
+            return
+        self.stop()
+        self._proc = subprocess.Popen(
+            [self._node, WORKER_SCRIPT, *self._package_dirs],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        self.requests = 0
+        header, _ = self._receive(None)
+        if not header["ok"]:
+            self.stop()
+            raise NodeWorkerError(str(header["error"]))
+
+    def stop(self) -> None:
+        """Stop the worker process."""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            assert proc.stdin is not None
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        finally:
+            if proc.stdout is not None:
+                proc.stdout.close()
+
+    def _receive(
+        self,
+        stderr_filter: Optional[Callable[[str], bool]],
+        out: Optional[IO[bytes]] = None,
+    ) -> Tuple[JSONDict, bytes]:
+        """Receive a response header and body from the worker.
+
+        If ``out`` is specified, the body is copied to it in chunks, and the
+        returned body is empty.
+        """
+        assert self._proc is not None and self._proc.stdout is not None
+        try:
+            header = json.loads(_read_frame(self._proc.stdout))
+            assert isinstance(header, dict)
+            log = header.get("log")
+            if log:
+                assert isinstance(log, list)
+                write_stderr("\n".join(log), stderr_filter=stderr_filter)
+            if out is not None and header["ok"]:
+                _copy_frame(self._proc.stdout, out)
+                body = b""
+            else:
+                body = _read_frame(self._proc.stdout)
+        except (OSError, EOFError, ValueError) as err:
+            self.stop()
+            raise NodeWorkerCrashed(str(err)) from err
+        except BaseException:
+            # The response may be partially read: never reuse this process.
+            self.stop()
+            raise
+        return header, body
+
+    def request(
+        self,
+        spec: bytes,
+        mode: str,
+        fmt: str,
+        stderr_filter: Optional[Callable[[str], bool]] = None,
+        out: Optional[IO[bytes]] = None,
+    ) -> bytes:
+        """Compile and/or render a chart.
+
+        Parameters
+        ----------
+        spec : bytes
+            The JSON-encoded Vega or Vega-Lite specification.
+        mode : string
+            The mode of the input spec: one of "vega" or "vega-lite".
+        fmt : string
+            The output format: one of "vega", "png", "svg", or "pdf".
+        stderr_filter : function(str)->bool (optional)
+            If provided, this function is used to filter log lines from display.
+        out : file-like object (optional)
+            If provided, the output is copied to this binary file in chunks
+            rather than being returned.
+
+        Returns
+        -------
+        output : bytes
+            The rendered output, or empty bytes if ``out`` is specified.
+
+        Raises
+        ------
+        NodeWorkerCrashed : if the worker process exits during the request.
+        NodeWorkerError : if the worker reports an error in rendering.
+        """
+        with self._lock:
+            self.start()
+            proc = self._proc
+            assert proc is not None
+            assert proc.stdin is not None
+            header = json.dumps({"mode": mode, "fmt": fmt}).encode()
+            try:
+                _write_frame(proc.stdin, header)
+                _write_frame(proc.stdin, spec)
+                proc.stdin.flush()
+            except OSError as err:
+                self.stop()
+                raise NodeWorkerCrashed(str(err)) from err
+            except BaseException:
+                self.stop()
+                raise
+            response, body = self._receive(stderr_filter, out)
+            self.requests += 1
+        if not response["ok"]:
+            raise NodeWorkerError(str(response["error"]))
+        return body
+
+
+class NodeWorkerPool:
+    """A pool of node workers for rendering charts in parallel.
+
+    Workers are started lazily, up to ``size`` of them, and requests block
+    until a worker is free. Each worker is restarted after ``max_requests``
+    requests to keep the memory use of long-running processes bounded.
+
+    Parameters
+    ----------
+    node : string
+        Path to the node executable.
+    package_dirs : list of strings
+        The vega-lite and vega-cli package directories, from which the
+        javascript dependencies are loaded.
+    size : int (optional)
+        The maximum number of workers. Defaults to the number of CPUs.
+    max_requests : int (optional)
+        The number of requests after which a worker is recycled. If None,
+        workers are never recycled.
+    """
+
+    size: int
+    max_requests: Optional[int]
+    _workers: List[NodeWorker]
+    _idle: "queue.LifoQueue[NodeWorker]"
+
+    def __init__(
+        self,
+        node: str,
+        package_dirs: List[str],
+        size: Optional[int] = None,
+        max_requests: Optional[int] = 1000,
+    ) -> None:
+        self._node = node
+        self._package_dirs = package_dirs
+        self.size = size or os.cpu_count() or 1
+        self.max_requests = max_requests
+        self._workers = []
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start a first worker, to confirm that rendering is available.
+
+        Raises
+        ------
+        NodeWorkerError : if the worker cannot load its dependencies.
+        """
+        worker = self._checkout()
+        try:
+            worker.start()
+        finally:
+            self._checkin(worker)
+
+    def stop(self) -> None:
+        """Stop all workers in the pool."""
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+    def _checkout(self) -> NodeWorker:
+        # Prefer an idle (and likely warm) worker; otherwise create a new one if
+        # the pool is not yet full, and otherwise wait for one to be returned.
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = NodeWorker(self._node, self._package_dirs)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _checkin(self, worker: NodeWorker) -> None:
+        if self.max_requests is not None and worker.requests >= self.max_requests:
+            worker.stop()
+        self._idle.put(worker)
+
+    def request(
+        self,
+        spec: bytes,
+        mode: str,
+        fmt: str,
+        stderr_filter: Optional[Callable[[str], bool]] = None,
+        out: Optional[IO[bytes]] = None,
+    ) -> bytes:
+        """Compile and/or render a chart on the next available worker.
+
+        If the worker exits during the request, it is restarted and the request
+        is retried once, unless output may already have been written to ``out``.
+        See :meth:`NodeWorker.request` for parameters.
+        """
+        worker = self._checkout()
+        try:
+            try:
+                return worker.request(spec, mode, fmt, stderr_filter, out)
+            except NodeWorkerCrashed:
+                if out is not None:
+                    raise
+                return worker.request(spec, mode, fmt, stderr_filter)
+        finally:
+            self._checkin(worker)
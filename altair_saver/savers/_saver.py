@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import json
 from typing import Any, Dict, IO, Iterable, List, Optional, Union
 
@@ -6,6 +7,7 @@ import altair as alt
 
 from altair_saver.types import Mimebundle, MimebundleContent, JSONDict
 from altair_saver._utils import (
+    atomic_open,
     extract_format,
     fmt_to_mimetype,
     infer_mode_from_spec,
@@ -20,10 +22,16 @@ class Saver(metaclass=abc.ABCMeta):
     Subclasses should:
     - specify the valid_formats class attribute
     - override the _serialize() method
+
+    Subclasses may additionally list binary formats in the streaming_formats
+    class attribute and override the _serialize_to() method, to write output
+    directly to a file when saving.
     """
 
     # list of supported formats, or (mode, format) pairs.
     valid_formats: Dict[str, List[str]] = {"vega": [], "vega-lite": []}
+    # list of binary formats that can be written directly to a file.
+    streaming_formats: List[str] = []
     _spec: JSONDict
     _mode: str
     _embed_options: JSONDict
@@ -56,11 +64,36 @@ class Saver(metaclass=abc.ABCMeta):
     def _serialize(self, fmt: str, content_type: str) -> MimebundleContent:
         ...
 
+    def _serialize_to(self, fmt: str, fp: IO[bytes]) -> None:
+        """Write the chart in the specified binary format to a file."""
+        content = self._serialize(fmt, "save")
+        assert isinstance(content, bytes)
+        fp.write(content)
+
     @classmethod
     def enabled(cls) -> bool:
         """Return true if this saver is enabled on the current system."""
         return True
 
+    async def _serialize_async(self, fmt: str, content_type: str) -> MimebundleContent:
+        """Coroutine version of _serialize().
+
+        By default this calls _serialize() directly, which is appropriate for
+        savers that do not block. Savers that block should override this.
+        """
+        return self._serialize(fmt, content_type)
+
+    def _mimetype(self, fmt: str) -> str:
+        if fmt not in self.valid_formats[self._mode]:
+            raise ValueError(
+                f"invalid fmt={fmt!r}; must be one of {self.valid_formats[self._mode]}."
+            )
+        return fmt_to_mimetype(
+            fmt,
+            vega_version=self._package_versions["vega"],
+            vegalite_version=self._package_versions["vega-lite"],
+        )
+
     def mimebundle(self, fmts: Union[str, Iterable[str]]) -> Mimebundle:
         """Return a mimebundle representation of the chart.
 
@@ -78,18 +111,29 @@ class Saver(metaclass=abc.ABCMeta):
             fmts = [fmts]
         bundle: Mimebundle = {}
         for fmt in fmts:
-            if fmt not in self.valid_formats[self._mode]:
-                raise ValueError(
-                    f"invalid fmt={fmt!r}; must be one of {self.valid_formats[self._mode]}."
-                )
-            mimetype = fmt_to_mimetype(
-                fmt,
-                vega_version=self._package_versions["vega"],
-                vegalite_version=self._package_versions["vega-lite"],
-            )
+            mimetype = self._mimetype(fmt)
             bundle[mimetype] = self._serialize(fmt, "mimebundle")
         return bundle
 
+    async def mimebundle_async(self, fmts: Union[str, Iterable[str]]) -> Mimebundle:
+        """Coroutine version of mimebundle(); see its documentation for details."""
+        if isinstance(fmts, str):
+            fmts = [fmts]
+        mimetypes = [self._mimetype(fmt) for fmt in fmts]
+        contents = await asyncio.gather(
+            *(self._serialize_async(fmt, "mimebundle") for fmt in fmts)
+        )
+        return dict(zip(mimetypes, contents))
+
+    def _check_format(self, fp: Optional[Union[IO, str]], fmt: Optional[str]) -> str:
+        if fmt is None:
+            if fp is None:
+                raise ValueError("Must specify either `fp` or `fmt` when saving chart")
+            fmt = extract_format(fp)
+        if fmt not in self.valid_formats[self._mode]:
+            raise ValueError(f"Got fmt={fmt}; expected one of {self.valid_formats}")
+        return fmt
+
     def save(
         self, fp: Optional[Union[IO, str]] = None, fmt: Optional[str] = None
     ) -> Optional[Union[str, bytes]]:
@@ -111,14 +155,31 @@ class Saver(metaclass=abc.ABCMeta):
             If fp is None, the serialized chart is returned.
             If fp is specified, the return value is None.
         """
-        if fmt is None:
-            if fp is None:
-                raise ValueError("Must specify either `fp` or `fmt` when saving chart")
-            fmt = extract_format(fp)
-        if fmt not in self.valid_formats[self._mode]:
-            raise ValueError(f"Got fmt={fmt}; expected one of {self.valid_formats}")
+        fmt = self._check_format(fp, fmt)
+
+        if fp is not None and fmt in self.streaming_formats:
+            # Stream files via a temporary file, so that a failed render neither
+            # leaves a partial output nor replaces an existing one.
+            if isinstance(fp, str):
+                with atomic_open(fp, "wb") as f:
+                    self._serialize_to(fmt, f)
+            else:
+                with maybe_open(fp, "wb") as f:
+                    self._serialize_to(fmt, f)
+            return None
+
+        return self._write(self._serialize(fmt, "save"), fp, fmt)
+
+    async def save_async(
+        self, fp: Optional[Union[IO, str]] = None, fmt: Optional[str] = None
+    ) -> Optional[Union[str, bytes]]:
+        """Coroutine version of save(); see its documentation for details."""
+        fmt = self._check_format(fp, fmt)
+        return self._write(await self._serialize_async(fmt, "save"), fp, fmt)
 
-        content = self._serialize(fmt, "save")
+    def _write(
+        self, content: MimebundleContent, fp: Optional[Union[IO, str]], fmt: str
+    ) -> Optional[Union[str, bytes]]:
         if fp is None:
             if isinstance(content, dict):
                 return json.dumps(content)
@@ -1,18 +1,28 @@
+import asyncio
 import atexit
 import base64
+from concurrent.futures import ThreadPoolExecutor
+import json
 import os
-from typing import Any, Dict, List, Optional, Union
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 import warnings
+import weakref
 
 import altair as alt
 from altair_data_server import Provider, Resource
-from altair_viewer import get_bundled_script
 import selenium.webdriver
+import tornado.web
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.common.exceptions import NoSuchElementException, WebDriverException
 
-from altair_saver.types import JSONDict, MimebundleContent
+from altair_saver.cache import compile_cache, compile_cache_key
+from altair_saver.types import JSONDict, Mimebundle, MimebundleContent
 from altair_saver.savers import Saver
+from altair_saver._utils import get_bundled_script
 
 
 class JavascriptError(RuntimeError):
@@ -21,6 +31,9 @@ class JavascriptError(RuntimeError):
 
 CDN_URL = "https://cdn.jsdelivr.net/npm/{package}@{version}"
 
+# Executables that must be available for the named webdrivers to start.
+DRIVER_EXECUTABLES = {"chrome": "chromedriver", "firefox": "geckodriver"}
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
@@ -36,84 +49,168 @@ HTML_TEMPLATE = """
 </html>
 """
 
-EXTRACT_CODE = """
-let spec = arguments[0];
-const embedOpt = arguments[1];
-const format = arguments[2];
-const done = arguments[3];
-
-if (format === 'vega') {
-    if (embedOpt.mode === 'vega-lite') {
-        vegaLite = (typeof vegaLite === "undefined") ? vl : vegaLite;
-        try {
-            const compiled = vegaLite.compile(spec);
-            spec = compiled.spec;
-        } catch(error) {
-            done({error: error.toString()})
+# Defines render(spec, embedOpt, formats, uploadUrl), which returns a promise of
+# the outputs in each format, all extracted from a single view. If uploadUrl is
+# given, png output is uploaded there as binary, and {upload: uploadUrl} is
+# returned in its place.
+RENDER_CODE = """
+function render(spec, embedOpt, formats, uploadUrl) {
+    const scaleFactor = embedOpt.scaleFactor || 1;
+
+    function toVega() {
+        if (embedOpt.mode !== 'vega-lite') {
+            return spec;
         }
+        vegaLite = (typeof vegaLite === "undefined") ? vl : vegaLite;
+        return vegaLite.compile(spec).spec;
     }
-    done({result: spec});
-}
 
-vegaEmbed('#vis', spec, embedOpt).then(function(result) {
-    if (format === 'png') {
-        result.view
-            .toCanvas(embedOpt.scaleFactor || 1)
-            .then(function(canvas){return canvas.toDataURL('image/png');})
-            .then(result => done({result}))
-            .catch(function(err) {
-                console.error(err);
-                done({error: err.toString()});
+    function extract(view, format) {
+        if (format === 'vega') {
+            return Promise.resolve().then(toVega);
+        } else if (format === 'png') {
+            return view.toCanvas(scaleFactor).then(function(canvas) {
+                if (!uploadUrl) {
+                    return canvas.toDataURL('image/png');
+                }
+                return new Promise(resolve => canvas.toBlob(resolve, 'image/png'))
+                    .then(function(blob) {
+                        if (blob === null) {
+                            throw new Error("Could not encode canvas");
+                        }
+                        return fetch(uploadUrl, {method: 'POST', body: blob});
+                    })
+                    .then(function(response) {
+                        if (!response.ok) {
+                            throw new Error("Upload failed: " + response.status);
+                        }
+                        return {upload: uploadUrl};
+                    })
+                    .catch(function(err) {
+                        console.error(err);
+                        return canvas.toDataURL('image/png');
+                    });
             });
-    } else if (format === 'svg') {
-        result.view
-            .toSVG(embedOpt.scaleFactor || 1)
-            .then(result => done({result}))
-            .catch(function(err) {
-                console.error(err);
-                done({error: err.toString()});
-            });
-    } else {
-        const error = "Unrecognized format: " + format;
-        console.error(error);
-        done({error});
+        } else if (format === 'svg') {
+            return view.toSVG(scaleFactor);
+        }
+        return Promise.reject(new Error("Unrecognized format: " + format));
+    }
+
+    if (formats.every(format => format === 'vega')) {
+        return Promise.all(formats.map(format => extract(null, format)));
     }
-}).catch(function(err) {
+
+    // Embed into a fresh element, and remove it once rendered so that the
+    // page can be reused for subsequent charts.
+    const el = document.createElement('div');
+    document.body.appendChild(el);
+    let view = null;
+    return vegaEmbed(el, spec, embedOpt).then(function(result) {
+        view = result.view;
+        return Promise.all(formats.map(format => extract(view, format)));
+    }).finally(function() {
+        if (view !== null) {
+            view.finalize();
+        }
+        el.remove();
+    });
+}
+"""
+
+EXTRACT_CODE = RENDER_CODE + """
+const spec = arguments[0];
+const embedOpt = arguments[1];
+const formats = arguments[2];
+const uploadUrl = arguments[3];
+const done = arguments[4];
+
+render(spec, embedOpt, formats, uploadUrl).then(result => done({result})).catch(function(err) {
     console.error(err);
     done({error: err.toString()});
 });
 """
 
+# Renders a list of [spec, embedOpt] items, at most `concurrency` at a time.
+BATCH_CODE = RENDER_CODE + """
+const items = arguments[0];
+const formats = arguments[1];
+const concurrency = arguments[2];
+const uploadUrl = arguments[3];
+const done = arguments[4];
+
+const results = new Array(items.length);
+let next = 0;
+function work() {
+    if (next >= items.length) {
+        return Promise.resolve();
+    }
+    const i = next++;
+    return render(items[i][0], items[i][1], formats, uploadUrl && uploadUrl + "-" + i)
+        .then(result => {results[i] = {result};})
+        .catch(function(err) {
+            console.error(err);
+            results[i] = {error: err.toString()};
+        })
+        .then(work);
+}
+
+const workers = [];
+for (let i = 0; i < Math.min(concurrency, items.length); i++) {
+    workers.push(work());
+}
+Promise.all(workers).then(() => done({result: results}));
+"""
 
-class _DriverRegistry:
-    """Registry of web driver singletons.
 
-    This prevents the need to start and stop drivers repeatedly.
-    """
+class _UploadHandler(tornado.web.RequestHandler):
+    """Receives binary output uploaded by the browser."""
 
-    drivers: Dict[str, WebDriver]
+    def initialize(self, uploads: Dict[str, bytes]) -> None:
+        self.uploads = uploads
+
+    def post(self, key: str) -> None:
+        self.uploads[key] = self.request.body
+
+
+class _Provider(Provider):
+    """A data server that also accepts uploads, at /upload/<key>."""
+
+    uploads: Dict[str, bytes]
 
     def __init__(self) -> None:
-        self.drivers = {}
+        self.uploads = {}
+        super().__init__()
 
-    def get(self, webdriver: Union[str, WebDriver], driver_timeout: float) -> WebDriver:
-        """Get a webdriver by name.
+    def _handlers(self) -> list:
+        return [
+            (r"/upload/(.+)", _UploadHandler, dict(uploads=self.uploads))
+        ] + super()._handlers()
 
-        Parameters
-        ----------
-        webdriver : string or WebDriver
-            The webdriver to use.
-        driver_timeout : float
-            The per-page driver timeout.
 
-        Returns
-        -------
-        webdriver : WebDriver
-        """
-        webdriver = self.drivers.get(webdriver, webdriver)
-        if isinstance(webdriver, WebDriver):
-            return webdriver
+class _DriverRegistry:
+    """Registry of pools of web drivers.
+
+    This prevents the need to start and stop drivers repeatedly. Drivers are
+    checked out for exclusive use by one thread at a time, and each named
+    driver has a pool of instances that are started lazily, so that callers
+    in several threads can render in parallel.
+    """
+
+    drivers: Dict[Union[str, WebDriver], List[WebDriver]]
+    _idle: Dict[Union[str, WebDriver], List[WebDriver]]
+    _starting: Dict[Union[str, WebDriver], int]
+    _renders: Dict[WebDriver, int]
+
+    def __init__(self) -> None:
+        self.drivers = {}
+        self._idle = {}
+        self._starting = {}
+        self._renders = {}
+        self._cond = threading.Condition()
+        atexit.register(self.stop)
 
+    def _create(self, webdriver: str, driver_timeout: float) -> WebDriver:
         if webdriver == "chrome":
             webdriver_class = selenium.webdriver.Chrome
             webdriver_options_class = selenium.webdriver.chrome.options.Options
@@ -139,25 +236,233 @@ class _DriverRegistry:
         webdriver_options.add_argument("--headless")
 
         driver_obj = webdriver_class(options=webdriver_options)
-        atexit.register(driver_obj.quit)
         driver_obj.set_page_load_timeout(driver_timeout)
-        self.drivers[webdriver] = driver_obj
-
         return driver_obj
 
+    def get(self, webdriver: Union[str, WebDriver], driver_timeout: float) -> WebDriver:
+        """Get a webdriver by name, starting it if necessary.
+
+        The returned driver may be in use by another thread: use
+        :meth:`checkout` to obtain a driver for rendering.
+
+        Parameters
+        ----------
+        webdriver : string or WebDriver
+            The webdriver to use.
+        driver_timeout : float
+            The per-page driver timeout.
+
+        Returns
+        -------
+        webdriver : WebDriver
+        """
+        if isinstance(webdriver, WebDriver):
+            return webdriver
+        with self._cond:
+            drivers = self.drivers.get(webdriver)
+            if drivers:
+                return drivers[0]
+        driver = self.checkout(webdriver, driver_timeout)
+        self.checkin(webdriver, driver)
+        return driver
+
+    def checkout(
+        self, webdriver: Union[str, WebDriver], driver_timeout: float, size: int = 1
+    ) -> WebDriver:
+        """Check out a webdriver for exclusive use.
+
+        Idle drivers are reused after a health check; otherwise a new driver is
+        started if fewer than ``size`` are running, and otherwise this blocks
+        until a driver is checked in. A WebDriver instance is its own pool of one.
+
+        Parameters
+        ----------
+        webdriver : string or WebDriver
+            The webdriver to use.
+        driver_timeout : float
+            The per-page driver timeout.
+        size : int
+            The maximum number of drivers of this name.
+
+        Returns
+        -------
+        webdriver : WebDriver
+        """
+        if isinstance(webdriver, WebDriver):
+            size = 1
+        while True:
+            with self._cond:
+                while True:
+                    idle = self._idle.setdefault(webdriver, [])
+                    running = len(self.drivers.get(webdriver, []))
+                    if idle or running + self._starting.get(webdriver, 0) < size:
+                        break
+                    self._cond.wait()
+                if idle:
+                    driver = idle.pop()
+                elif isinstance(webdriver, WebDriver):
+                    self.drivers[webdriver] = [webdriver]
+                    self._renders[webdriver] = 0
+                    return webdriver
+                else:
+                    self._starting[webdriver] = self._starting.get(webdriver, 0) + 1
+                    break
+            if driver is webdriver or self._healthy(driver):
+                return driver
+            self._retire(webdriver, driver)
+
+        try:
+            driver = self._create(webdriver, driver_timeout)
+        except BaseException:
+            with self._cond:
+                self._starting[webdriver] -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting[webdriver] -= 1
+            self.drivers.setdefault(webdriver, []).append(driver)
+            self._renders[driver] = 0
+        return driver
+
+    def checkin(
+        self,
+        webdriver: Union[str, WebDriver],
+        driver: WebDriver,
+        healthy: bool = True,
+        max_renders: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ) -> None:
+        """Return a checked out webdriver to the pool.
+
+        Parameters
+        ----------
+        webdriver : string or WebDriver
+            The webdriver used for checkout.
+        driver : WebDriver
+            The checked out driver.
+        healthy : bool
+            If False, the driver is stopped rather than reused.
+        max_renders : int (optional)
+            If specified, the driver is stopped after this many checkouts.
+        max_memory : int (optional)
+            If specified, the driver is stopped once the javascript heap of its
+            page exceeds this many bytes. Supported only by chrome.
+        """
+        with self._cond:
+            self._renders[driver] = self._renders.get(driver, 0) + 1
+            renders = self._renders[driver]
+        if healthy and max_renders is not None and renders >= max_renders:
+            healthy = False
+        if healthy and max_memory is not None:
+            healthy = (self._memory(driver) or 0) <= max_memory
+        if not healthy and driver is not webdriver:
+            self._retire(webdriver, driver)
+            return
+        with self._cond:
+            self._idle.setdefault(webdriver, []).append(driver)
+            self._cond.notify()
+
+    @staticmethod
+    def _healthy(driver: WebDriver) -> bool:
+        try:
+            driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+    @staticmethod
+    def _memory(driver: WebDriver) -> Optional[int]:
+        try:
+            return driver.execute_script(
+                "return window.performance.memory"
+                " && window.performance.memory.usedJSHeapSize"
+            )
+        except WebDriverException:
+            return None
+
+    def _retire(self, webdriver: Union[str, WebDriver], driver: WebDriver) -> None:
+        with self._cond:
+            self.drivers[webdriver].remove(driver)
+            self._renders.pop(driver, None)
+            self._cond.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        """Stop all drivers started by the registry."""
+        with self._cond:
+            drivers = [
+                driver
+                for webdriver, running in self.drivers.items()
+                if not isinstance(webdriver, WebDriver)
+                for driver in running
+            ]
+            self.drivers.clear()
+            self._idle.clear()
+            self._renders.clear()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
 
 class SeleniumSaver(Saver):
-    """Save charts using a selenium engine."""
+    """Save charts using a selenium engine.
+
+    By default, each driver keeps a resident page with the javascript
+    libraries loaded, and each chart is rendered into a fresh element on that
+    page. The page is reloaded after ``page_max_renders`` renders, or after
+    a render fails.
+
+    Charts saved concurrently from several threads are rendered in parallel
+    on a pool of up to ``driver_pool_size`` drivers. Drivers are restarted
+    after ``driver_max_renders`` renders, or once the javascript heap of their
+    page exceeds ``driver_max_memory`` bytes (chrome only).
+    """
 
     valid_formats: Dict[str, List[str]] = {
         "vega": ["png", "svg"],
         "vega-lite": ["png", "svg", "vega"],
     }
     driver_options: List[Union[str, WebDriver]] = ["chrome", "firefox"]
+    # Seconds for which the result of the enabled() probe is cached.
+    probe_ttl: float = 60
+    _probe: Optional[Tuple[float, Optional[Union[str, WebDriver]]]] = None
+
+    driver_pool_size: int = 1
+    driver_max_renders: Optional[int] = None
+    driver_max_memory: Optional[int] = None
+
+    # Coroutines render in a bounded executor: a driver handles one page at a time.
+    # Defaults to the size of the driver pool.
+    max_async_workers: Optional[int] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    # Number of charts rendered on a resident page before it is reloaded.
+    page_max_renders: int = 100
+
+    # Seconds allowed for rendering each chart. A script rendering a batch of
+    # charts in save_many() is allowed this much time per chart in the batch.
+    script_timeout: float = 30
+
+    # Inline datasets larger than this many bytes of JSON are served to the
+    # browser over HTTP, rather than sent within the spec. None to disable.
+    data_url_threshold: Optional[int] = 2 ** 18
 
     _registry: _DriverRegistry = _DriverRegistry()
-    _provider: Optional[Provider] = None
+    _provider: Optional[_Provider] = None
     _resources: Dict[str, Resource] = {}
+    _page_urls: Dict[str, str] = {}
+    _page_state: "weakref.WeakKeyDictionary[WebDriver, Tuple[str, int]]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _script_timeouts: "weakref.WeakKeyDictionary[WebDriver, float]" = (
+        weakref.WeakKeyDictionary()
+    )
+    _serve_lock: threading.Lock = threading.Lock()
 
     def __init__(
         self,
@@ -171,12 +476,12 @@ class SeleniumSaver(Saver):
         webdriver: Optional[Union[str, WebDriver]] = None,
         offline: bool = True,
         scale_factor: Optional[float] = 1,
+        reuse_page: bool = True,
         **kwargs: Any,
     ) -> None:
         self._driver_timeout = driver_timeout
-        self._webdriver = (
-            self._select_webdriver(driver_timeout) if webdriver is None else webdriver
-        )
+        self._reuse_page = reuse_page
+        self._webdriver = webdriver
         self._offline = offline
         if scale_factor != 1:
             embed_options = embed_options or {}
@@ -206,48 +511,119 @@ class SeleniumSaver(Saver):
                 return driver
         return None
 
+    @classmethod
+    def _probe_webdriver(cls) -> Optional[Union[str, WebDriver]]:
+        """Return the first webdriver whose driver executable is available.
+
+        Unlike _select_webdriver(), this does not start a browser. The result
+        is cached for ``probe_ttl`` seconds.
+        """
+        now = time.monotonic()
+        if cls._probe is not None and now - cls._probe[0] < cls.probe_ttl:
+            return cls._probe[1]
+        webdriver = None
+        for driver in cls.driver_options:
+            if isinstance(driver, WebDriver) or shutil.which(
+                DRIVER_EXECUTABLES.get(driver, driver)
+            ):
+                webdriver = driver
+                break
+        cls._probe = (now, webdriver)
+        return webdriver
+
     @classmethod
     def enabled(cls) -> bool:
-        return cls._select_webdriver(20) is not None
+        return cls._probe_webdriver() is not None
+
+    def _get_webdriver(self) -> Union[str, WebDriver]:
+        # The browser is started on first use, rather than when the saver is created.
+        if self._webdriver is None:
+            self._webdriver = self._select_webdriver(self._driver_timeout)
+            if self._webdriver is None:
+                raise RuntimeError(
+                    f"No webdriver could be started; tried {self.driver_options}"
+                )
+        return self._webdriver
 
     @classmethod
-    def _serve(cls, content: str, js_resources: Dict[str, str]) -> str:
-        if cls._provider is None:
-            cls._provider = Provider()
-        resource = cls._provider.create(
-            content=content, route="", headers={"Access-Control-Allow-Origin": "*"},
-        )
-        cls._resources[resource.url] = resource
-        for route, content in js_resources.items():
-            cls._resources[route] = cls._provider.create(content=content, route=route,)
-        return resource.url
+    def _serve(cls, content: str, scripts: Dict[str, Tuple[str, str]]) -> str:
+        """Serve a page, along with the bundled scripts it references.
+
+        ``scripts`` maps routes to (package, version) pairs. Each script is
+        served once, and shared by all pages that reference it.
+        """
+        with cls._serve_lock:
+            if cls._provider is None:
+                cls._provider = _Provider()
+            # Each page gets its own route, so that releasing a single-use page
+            # does not affect concurrent loads of an identical page.
+            resource = cls._provider.create(
+                content=content,
+                route=f"{uuid.uuid4().hex}.html",
+                headers={"Access-Control-Allow-Origin": "*"},
+            )
+            cls._resources[resource.url] = resource
+            for route, (package, version) in scripts.items():
+                if route not in cls._resources:
+                    cls._resources[route] = cls._provider.create(
+                        content=get_bundled_script(package, version), route=route,
+                    )
+            return resource.url
 
     @classmethod
-    def _stop_serving(cls) -> None:
-        if cls._provider is not None:
-            cls._provider.stop()
-            cls._provider = None
+    def _serve_data(cls, content: str) -> str:
+        """Serve a JSON dataset, returning its URL."""
+        with cls._serve_lock:
+            if cls._provider is None:
+                cls._provider = _Provider()
+            # Each dataset gets its own route, so that releasing it does not
+            # affect concurrent renders of the same data.
+            resource = cls._provider.create(
+                content=content,
+                route=f"{uuid.uuid4().hex}.json",
+                headers={"Access-Control-Allow-Origin": "*"},
+            )
+            cls._resources[resource.url] = resource
+            return resource.url
 
-    def _extract(self, fmt: str) -> MimebundleContent:
-        driver = self._registry.get(self._webdriver, self._driver_timeout)
+    @classmethod
+    def _release(cls, url: str) -> None:
+        """Stop serving a page."""
+        with cls._serve_lock:
+            cls._resources.pop(url, None)
 
+    @classmethod
+    def _stop_serving(cls) -> None:
+        with cls._serve_lock:
+            if cls._provider is not None:
+                cls._provider.stop()
+                cls._provider = None
+            cls._resources.clear()
+        cls._page_urls.clear()
+        cls._page_state.clear()
+
+    def _page_url(self) -> str:
+        """Serve the page used for rendering, and return its URL.
+
+        Resident pages are served once, and shared between savers. Otherwise,
+        the page should be released with :meth:`_release` after use.
+        """
         if self._offline:
-            js_resources = {
-                "vega.js": get_bundled_script("vega", self._package_versions["vega"]),
-                "vega-lite.js": get_bundled_script(
-                    "vega-lite", self._package_versions["vega-lite"]
-                ),
-                "vega-embed.js": get_bundled_script(
-                    "vega-embed", self._package_versions["vega-embed"]
-                ),
+            scripts = {
+                f"{package}-{self._package_versions[package]}.js": (
+                    package,
+                    self._package_versions[package],
+                )
+                for package in ["vega", "vega-lite", "vega-embed"]
             }
+            vega_url, vegalite_url, vegaembed_url = (f"/{route}" for route in scripts)
             html = HTML_TEMPLATE.format(
-                vega_url="/vega.js",
-                vegalite_url="/vega-lite.js",
-                vegaembed_url="/vega-embed.js",
+                vega_url=vega_url,
+                vegalite_url=vegalite_url,
+                vegaembed_url=vegaembed_url,
             )
         else:
-            js_resources = {}
+            scripts = {}
             html = HTML_TEMPLATE.format(
                 vega_url=CDN_URL.format(
                     package="vega", version=self._package_versions["vega"]
@@ -260,7 +636,19 @@ class SeleniumSaver(Saver):
                 ),
             )
 
-        url = self._serve(html, js_resources)
+        if not self._reuse_page:
+            return self._serve(html, scripts)
+        with self._serve_lock:
+            url = self._page_urls.get(html)
+        if url is None:
+            served = self._serve(html, scripts)
+            with self._serve_lock:
+                url = self._page_urls.setdefault(html, served)
+            if url != served:
+                self._release(served)
+        return url
+
+    def _load_page(self, driver: WebDriver, url: str, fmts: List[str]) -> None:
         driver.get("about:blank")
         driver.get(url)
         try:
@@ -270,19 +658,341 @@ class SeleniumSaver(Saver):
         if not self._offline:
             online = driver.execute_script("return navigator.onLine")
             if not online:
+                fmt = ", ".join(fmts)
                 raise RuntimeError(
                     f"Internet connection required for saving chart as {fmt} with offline=False."
                 )
+
+    def _extract(self, fmt: str) -> MimebundleContent:
+        return self._extract_formats([fmt])[0]
+
+    def _extract_formats(self, fmts: List[str]) -> List[MimebundleContent]:
+        """Extract several formats from a single rendering of the chart."""
+        spec, urls = self._externalize_data(fmts)
+        upload_url = self._upload_url()
+        try:
+            outputs = self._execute(
+                EXTRACT_CODE, [spec, self._embed_opt(), fmts, upload_url], fmts
+            )
+            return [self._take_upload(out) for out in outputs]
+        finally:
+            for url in urls:
+                self._release(url)
+            self._discard_uploads(upload_url)
+
+    @staticmethod
+    def _upload_url() -> str:
+        return f"/upload/{uuid.uuid4().hex}"
+
+    @classmethod
+    def _take_upload(cls, out: Any) -> Any:
+        """Replace a reference to an uploaded output with the uploaded bytes."""
+        if not (isinstance(out, dict) and set(out) == {"upload"}):
+            return out
+        assert cls._provider is not None
+        return cls._provider.uploads.pop(out["upload"][len("/upload/") :])
+
+    @classmethod
+    def _discard_uploads(cls, upload_url: str) -> None:
+        """Discard any uploads that were not taken, e.g. after an error."""
+        if cls._provider is None:
+            return
+        prefix = upload_url[len("/upload/") :]
+        for key in [key for key in cls._provider.uploads if key.startswith(prefix)]:
+            cls._provider.uploads.pop(key, None)
+
+    def _externalize_data(self, fmts: List[str]) -> Tuple[JSONDict, List[str]]:
+        """Replace large inline datasets of the spec with URLs of served copies.
+
+        Returns the rewritten spec, and the URLs to release after rendering.
+        The spec is left as-is when extracting the vega spec, which must
+        contain the original data.
+        """
+        urls: List[str] = []
+        threshold = self.data_url_threshold
+        if threshold is None or "vega" in fmts:
+            return self._spec, urls
+
+        def serve(values: Any) -> Optional[str]:
+            if not isinstance(values, list):
+                return None
+            content = json.dumps(values)
+            if len(content) < threshold:
+                return None
+            url = self._serve_data(content)
+            urls.append(url)
+            return url
+
+        # Vega-Lite top-level datasets are referenced by name from data definitions.
+        spec = self._spec
+        dataset_urls: Dict[str, str] = {}
+        spec_datasets = spec.get("datasets")
+        if self._mode == "vega-lite" and isinstance(spec_datasets, dict):
+            datasets = dict(spec_datasets)
+            for name, values in spec_datasets.items():
+                url = serve(values)
+                if url is not None:
+                    dataset_urls[name] = url
+                    del datasets[name]
+            spec = {**spec, "datasets": datasets}
+
+        def rewrite(data: JSONDict) -> JSONDict:
+            if "values" in data:
+                url = serve(data["values"])
+                if url is not None:
+                    data = {key: val for key, val in data.items() if key != "values"}
+                    data["url"] = url
+            elif "url" not in data and data.get("name") in dataset_urls:
+                url = dataset_urls[str(data["name"])]
+                data = {key: val for key, val in data.items() if key != "name"}
+                data["url"] = url
+            return data
+
+        def visit(obj: Any, key: Optional[str] = None) -> Any:
+            if isinstance(obj, list):
+                return [visit(item, key) for item in obj]
+            if not isinstance(obj, dict):
+                return obj
+            if key == "data":
+                obj = rewrite(obj)
+            return {
+                k: v if k in ["values", "datasets"] else visit(v, k)
+                for k, v in obj.items()
+            }
+
+        return visit(spec), urls
+
+    def _embed_opt(self) -> JSONDict:
         opt = self._embed_options.copy()
         opt["mode"] = self._mode
-        result = driver.execute_async_script(EXTRACT_CODE, self._spec, opt, fmt)
+        return opt
+
+    def _execute(
+        self, code: str, args: List[Any], fmts: List[str], renders: int = 1
+    ) -> Any:
+        """Run a rendering script on a checked out driver, returning its result.
+
+        ``renders`` is the number of charts rendered by the script, counted
+        towards the reload of the resident page.
+        """
+        webdriver = self._get_webdriver()
+        driver = self._registry.checkout(
+            webdriver, self._driver_timeout, self.driver_pool_size
+        )
+        healthy = True
+        try:
+            return self._render(driver, code, args, fmts, renders)
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self._registry.checkin(
+                webdriver,
+                driver,
+                healthy=healthy,
+                max_renders=self.driver_max_renders,
+                max_memory=self.driver_max_memory,
+            )
+
+    def _render(
+        self, driver: WebDriver, code: str, args: List[Any], fmts: List[str], count: int
+    ) -> Any:
+        url = self._page_url()
+
+        # The page state is only restored once a render succeeds, so that the
+        # page is reloaded after any error.
+        url_loaded, renders = self._page_state.pop(driver, ("", 0))
+        if not (
+            self._reuse_page and url == url_loaded and renders < self.page_max_renders
+        ):
+            try:
+                self._load_page(driver, url, fmts)
+            finally:
+                if not self._reuse_page:
+                    # The page is not needed once loaded.
+                    self._release(url)
+            renders = 0
+
+        timeout = self.script_timeout * count
+        if self._script_timeouts.get(driver) != timeout:
+            driver.set_script_timeout(timeout)
+            self._script_timeouts[driver] = timeout
+        result = driver.execute_async_script(code, *args)
         if "error" in result:
             raise JavascriptError(result["error"])
+        if self._reuse_page:
+            self._page_state[driver] = (url, renders + count)
         return result["result"]
 
+    @classmethod
+    def save_many(
+        cls,
+        specs: Iterable[JSONDict],
+        fmt: str,
+        mode: Optional[str] = None,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        **kwargs: Any,
+    ) -> List[Union[str, bytes, Exception]]:
+        """Render many charts, with few browser round trips.
+
+        Charts are sent to the browser in batches, and each batch is rendered
+        by a single script, with up to ``concurrency`` charts in flight at a time.
+
+        Parameters
+        ----------
+        specs : list of dicts
+            The Vega or Vega-Lite specifications of the charts.
+        fmt : string
+            The format in which to render the charts.
+        mode : string (optional)
+            The mode of the specifications. If not specified, it is inferred
+            for each specification.
+        batch_size : int
+            The maximum number of charts rendered per script call. The script
+            may run for ``script_timeout`` seconds per chart.
+        concurrency : int
+            The maximum number of charts rendered concurrently within the browser.
+        **kwargs :
+            Additional keyword arguments are passed to the saver for each chart.
+
+        Returns
+        -------
+        results : list
+            For each chart, the serialized chart as returned by :meth:`save`,
+            or the exception raised in rendering it.
+        """
+        results: Dict[int, Union[str, bytes, Exception]] = {}
+        pending: List[Tuple[int, "SeleniumSaver"]] = []
+        count = 0
+        for i, spec in enumerate(specs):
+            count += 1
+            try:
+                saver = cls(spec, mode=mode, **kwargs)
+                saver._check_format(None, fmt)
+            except ValueError as err:
+                results[i] = err
+                continue
+            if fmt == "vega" and saver._mode == "vega-lite":
+                vg_json = compile_cache.get(saver._compile_cache_key())
+                if vg_json is not None:
+                    # Return the same form as for a rendered spec.
+                    out = saver._write(json.loads(vg_json), None, fmt)
+                    assert out is not None
+                    results[i] = out
+                    continue
+            pending.append((i, saver))
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start : start + batch_size]
+            items = []
+            urls: List[str] = []
+            for _, saver in batch:
+                spec, spec_urls = saver._externalize_data([fmt])
+                items.append([spec, saver._embed_opt()])
+                urls.extend(spec_urls)
+            upload_url = cls._upload_url()
+            try:
+                outputs = batch[0][1]._execute(
+                    BATCH_CODE,
+                    [items, [fmt], concurrency, upload_url],
+                    [fmt],
+                    len(batch),
+                )
+                for output in outputs:
+                    if "result" in output:
+                        output["result"] = [
+                            cls._take_upload(out) for out in output["result"]
+                        ]
+            except (RuntimeError, WebDriverException) as err:
+                for i, _ in batch:
+                    results[i] = err
+                continue
+            finally:
+                for url in urls:
+                    cls._release(url)
+                cls._discard_uploads(upload_url)
+            for (i, saver), output in zip(batch, outputs):
+                if "error" in output:
+                    results[i] = JavascriptError(output["error"])
+                    continue
+                content = saver._decode(fmt, output["result"][0])
+                if fmt == "vega" and saver._mode == "vega-lite":
+                    compile_cache.set(
+                        saver._compile_cache_key(), json.dumps(content).encode()
+                    )
+                out = saver._write(content, None, fmt)
+                assert out is not None
+                results[i] = out
+        return [results[i] for i in range(count)]
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                cls.max_async_workers or cls.driver_pool_size
+            )
+        return cls._executor
+
+    async def _serialize_async(self, fmt: str, content_type: str) -> MimebundleContent:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), self._serialize, fmt, content_type
+        )
+
+    def mimebundle(self, fmts: Union[str, Iterable[str]]) -> Mimebundle:
+        """Return a mimebundle representation of the chart.
+
+        All requested formats are extracted from a single rendering of the chart.
+
+        Parameters
+        ----------
+        fmts : list of strings
+            A list of formats to include in the results.
+
+        Returns
+        -------
+        mimebundle : dict
+            The chart's mimebundle representation.
+        """
+        if isinstance(fmts, str):
+            fmts = [fmts]
+        fmts = list(fmts)
+        mimetypes = [self._mimetype(fmt) for fmt in fmts]
+        return dict(zip(mimetypes, self._serialize_formats(fmts)))
+
+    async def mimebundle_async(self, fmts: Union[str, Iterable[str]]) -> Mimebundle:
+        """Coroutine version of mimebundle(); see its documentation for details."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._get_executor(), self.mimebundle, fmts)
+
     def _serialize(self, fmt: str, content_type: str) -> MimebundleContent:
-        out = self._extract(fmt)
+        return self._serialize_formats([fmt])[0]
+
+    def _compile_cache_key(self) -> str:
+        return compile_cache_key(self._spec, self._package_versions["vega-lite"])
+
+    def _serialize_formats(self, fmts: List[str]) -> List[MimebundleContent]:
+        results: Dict[str, MimebundleContent] = {}
+        key = None
+        if "vega" in fmts and self._mode == "vega-lite":
+            key = self._compile_cache_key()
+            vg_json = compile_cache.get(key)
+            if vg_json is not None:
+                results["vega"] = json.loads(vg_json)
+        pending = [fmt for fmt in dict.fromkeys(fmts) if fmt not in results]
+        if pending:
+            for fmt, out in zip(pending, self._extract_formats(pending)):
+                results[fmt] = self._decode(fmt, out)
+            if key is not None and "vega" in pending:
+                compile_cache.set(key, json.dumps(results["vega"]).encode())
+        return [results[fmt] for fmt in fmts]
+
+    @staticmethod
+    def _decode(fmt: str, out: MimebundleContent) -> MimebundleContent:
         if fmt == "png":
+            if isinstance(out, bytes):
+                return out
             assert isinstance(out, str)
             return base64.b64decode(out.split(",", 1)[1].encode())
         elif fmt == "svg":
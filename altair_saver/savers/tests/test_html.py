@@ -4,10 +4,12 @@ import os
 from typing import Any, Dict, IO, Iterator, Optional, Tuple
 
 from altair_data_server import Provider
+import altair_viewer
 from PIL import Image
 import pytest
 import selenium.webdriver
 from selenium.webdriver.remote.webdriver import WebDriver
+from _pytest.monkeypatch import MonkeyPatch
 
 from altair_saver import HTMLSaver
 from altair_saver._utils import internet_connected
@@ -97,6 +99,53 @@ def test_bad_format() -> None:
         saver.mimebundle("vega")
 
 
+def test_inline_scripts_memoized(monkeypatch: MonkeyPatch) -> None:
+    calls = []
+
+    def get_bundled_script(package: str, version: str) -> str:
+        calls.append(package)
+        return f"// {package}@{version}"
+
+    monkeypatch.setattr(altair_viewer, "get_bundled_script", get_bundled_script)
+    versions = {
+        "vega_version": "0.0.0-test",
+        "vegalite_version": "0.0.0-test",
+        "vegaembed_version": "0.0.0-test",
+    }
+    for i in range(3):
+        saver = HTMLSaver({"mark": i}, mode="vega-lite", inline=True, **versions)
+        html = saver.save(fmt="html")
+        assert isinstance(html, str)
+        assert "// vega-lite@0.0.0-test" in html
+        assert '{"mark": %d}' % i in html
+    assert sorted(calls) == ["vega", "vega-embed", "vega-lite"]
+
+
+@pytest.mark.parametrize("deterministic_id", [None, True, False])
+@pytest.mark.parametrize("content_type", ["save", "mimebundle"])
+def test_deterministic_id(content_type: str, deterministic_id: Optional[bool]) -> None:
+    def output(spec: Dict[str, Any]) -> Any:
+        saver = HTMLSaver(spec, mode="vega-lite", deterministic_id=deterministic_id)
+        if content_type == "save":
+            return saver.save(fmt="html")
+        return saver.mimebundle("html")["text/html"]
+
+    if deterministic_id is None:
+        deterministic_id = content_type == "save"
+    spec = {"mark": "point"}
+    assert (output(spec) == output(spec)) == deterministic_id
+    assert output(spec) != output({"mark": "bar"})
+
+
+@pytest.mark.parametrize("standalone", [True, False])
+def test_deterministic_id_standalone(standalone: bool) -> None:
+    def output() -> Any:
+        saver = HTMLSaver({"mark": "point"}, mode="vega-lite", standalone=standalone)
+        return saver.save(fmt="html")
+
+    assert (output() == output()) == standalone
+
+
 @pytest.mark.parametrize("case, data", get_testcases())
 @pytest.mark.parametrize("inline", [True, False])
 def test_html_save_rendering(
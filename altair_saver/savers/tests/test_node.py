@@ -1,6 +1,8 @@
+import asyncio
 import io
 import json
 import os
+import subprocess
 from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
 
 from PIL import Image
@@ -10,6 +12,7 @@ from _pytest.capture import SysCapture
 from _pytest.monkeypatch import MonkeyPatch
 
 from altair_saver import NodeSaver
+from altair_saver.cache import TieredCache
 from altair_saver._utils import fmt_to_mimetype
 from altair_saver.savers import _node
 from altair_saver.savers.tests._utils import SVGImage
@@ -129,3 +132,265 @@ def test_stderr_suppression(
         assert message not in captured.err
     else:
         assert message in captured.err
+
+
+def test_compile_cache(monkeypatch: MonkeyPatch) -> None:
+    calls: List[List[str]] = []
+
+    def check_output_with_stderr(cmd: List[str], **kwargs: Any) -> bytes:
+        calls.append(cmd)
+        return b'{"marks": []}'
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_output_with_stderr", check_output_with_stderr)
+    monkeypatch.setattr(_node, "compile_cache", TieredCache())
+
+    spec: JSONDict = {"mark": "point"}
+    for i in range(2):
+        saver = NodeSaver(spec, mode="vega-lite", use_worker=False)
+        assert saver.save(fmt="vega") == '{"marks": []}'
+    assert calls == [["vl2vg"]]
+
+    # Entries are keyed by the installed vega-lite version, not vegalite_version.
+    saver = NodeSaver(spec, mode="vega-lite", use_worker=False, vegalite_version="0")
+    saver.save(fmt="vega")
+    assert calls == [["vl2vg"]]
+    monkeypatch.setattr(_node, "_vegalite_version", lambda vl2vg: "0.0.1")
+    NodeSaver(spec, mode="vega-lite", use_worker=False).save(fmt="vega")
+    assert calls == [["vl2vg"], ["vl2vg"]]
+
+
+def test_vegalite_version(tmp_path: str) -> None:
+    package_dir = os.path.join(str(tmp_path), "vega-lite")
+    os.makedirs(os.path.join(package_dir, "bin"))
+    vl2vg = os.path.join(package_dir, "bin", "vl2vg")
+    assert _node._vegalite_version(vl2vg) == f"node:{vl2vg}"
+    with open(os.path.join(package_dir, "package.json"), "w") as f:
+        json.dump({"name": "vega-lite", "version": "4.17.0"}, f)
+    _node._vegalite_version.cache_clear()
+    assert _node._vegalite_version(vl2vg) == "4.17.0"
+
+
+def test_compile_once(monkeypatch: MonkeyPatch) -> None:
+    calls: List[str] = []
+
+    def check_output_with_stderr(cmd: List[str], input: bytes, **kwargs: Any) -> bytes:
+        calls.append(cmd[0])
+        if cmd[0] == "vl2vg":
+            return b'{"marks": []}'
+        assert input == b'{"marks": []}'
+        return b"<svg></svg>"
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_output_with_stderr", check_output_with_stderr)
+    monkeypatch.setattr(_node, "compile_cache", TieredCache())
+
+    saver = NodeSaver({"mark": "point"}, use_worker=False)
+    bundle = saver.mimebundle(["vega", "png", "svg", "pdf"])
+    assert len(bundle) == 4
+    assert calls == ["vl2vg", "vg2png", "vg2svg", "vg2pdf"]
+
+
+def test_save_pipeline(monkeypatch: MonkeyPatch) -> None:
+    calls: List[List[List[str]]] = []
+
+    def check_pipeline_with_stderr(cmds: List[List[str]], **kwargs: Any) -> bytes:
+        calls.append(cmds)
+        return b"<svg></svg>"
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_pipeline_with_stderr", check_pipeline_with_stderr)
+    monkeypatch.setattr(_node, "compile_cache", TieredCache())
+
+    saver = NodeSaver({"mark": "point"}, use_worker=False, vega_cli_options=["-s", "2"])
+    assert saver.save(fmt="svg") == "<svg></svg>"
+    assert calls == [[["vl2vg"], ["vg2svg", "-s", "2"]]]
+
+    # Once the spec has been compiled, the renderer is run alone.
+    monkeypatch.setattr(saver, "_vg_json", b'{"marks": []}')
+    saver.save(fmt="svg")
+    assert calls[-1] == [["vg2svg", "-s", "2"]]
+
+
+@pytest.mark.parametrize("fmt", ["png", "pdf"])
+def test_save_streaming(monkeypatch: MonkeyPatch, fmt: str) -> None:
+    def check_pipeline_with_stderr(
+        cmds: List[List[str]], out: Optional[IO[bytes]] = None, **kwargs: Any
+    ) -> bytes:
+        assert out is not None
+        out.write(b"chunk1")
+        out.write(b"chunk2")
+        return b""
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_pipeline_with_stderr", check_pipeline_with_stderr)
+
+    saver = NodeSaver({"mark": "point"}, use_worker=False)
+    fp = io.BytesIO()
+    assert saver.save(fp, fmt=fmt) is None
+    assert fp.getvalue() == b"chunk1chunk2"
+
+
+def test_save_streaming_error(monkeypatch: MonkeyPatch, tmp_path: str) -> None:
+    def check_pipeline_with_stderr(
+        cmds: List[List[str]], out: Optional[IO[bytes]] = None, **kwargs: Any
+    ) -> bytes:
+        assert out is not None
+        out.write(b"partial")
+        raise subprocess.CalledProcessError(1, cmds[-1])
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_pipeline_with_stderr", check_pipeline_with_stderr)
+
+    saver = NodeSaver({"mark": "point"}, use_worker=False)
+    filename = os.path.join(str(tmp_path), "chart.png")
+    with pytest.raises(subprocess.CalledProcessError):
+        saver.save(filename)
+    assert os.listdir(str(tmp_path)) == []
+
+    # An existing output is left in place.
+    with open(filename, "wb") as out:
+        out.write(b"original")
+    with pytest.raises(subprocess.CalledProcessError):
+        saver.save(filename)
+    assert os.listdir(str(tmp_path)) == ["chart.png"]
+    with open(filename, "rb") as f:
+        assert f.read() == b"original"
+
+
+def test_save_streaming_file(monkeypatch: MonkeyPatch, tmp_path: str) -> None:
+    def check_pipeline_with_stderr(
+        cmds: List[List[str]], out: Optional[IO[bytes]] = None, **kwargs: Any
+    ) -> bytes:
+        assert out is not None
+        out.write(b"rendered")
+        return b""
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(_node, "check_pipeline_with_stderr", check_pipeline_with_stderr)
+
+    filename = os.path.join(str(tmp_path), "chart.png")
+    with open(filename, "wb") as out:
+        out.write(b"original")
+    NodeSaver({"mark": "point"}, use_worker=False).save(filename)
+    assert os.listdir(str(tmp_path)) == ["chart.png"]
+    with open(filename, "rb") as f:
+        assert f.read() == b"rendered"
+
+
+def _make_executable(directory: str, name: str) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def test_exec_path_env_override(monkeypatch: MonkeyPatch, tmp_path: str) -> None:
+    def npm_bin(global_: bool) -> str:
+        raise AssertionError("npm should not be called")
+
+    monkeypatch.setattr(_node, "npm_bin", npm_bin)
+    monkeypatch.setenv(_node.EXEC_PATH_ENV, str(tmp_path))
+    _node.exec_path.cache_clear()
+    try:
+        path = _make_executable(str(tmp_path), "altair-saver-test-vl2vg")
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        with pytest.raises(_node.ExecutableNotFound):
+            _node.exec_path("altair-saver-test-missing")
+    finally:
+        _node.exec_path.cache_clear()
+
+
+def test_exec_path_disk_cache(monkeypatch: MonkeyPatch, tmp_path: str) -> None:
+    bin_dir = os.path.join(str(tmp_path), "bin")
+    os.makedirs(bin_dir)
+    path = _make_executable(bin_dir, "altair-saver-test-vl2vg")
+    npm_calls: List[bool] = []
+
+    def npm_bin(global_: bool) -> str:
+        npm_calls.append(global_)
+        return bin_dir
+
+    monkeypatch.delenv(_node.EXEC_PATH_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(str(tmp_path), "cache"))
+    monkeypatch.setattr(_node, "npm_bin", npm_bin)
+    try:
+        _node.exec_path.cache_clear()
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        assert npm_calls == [True]
+
+        # A new lookup uses the path stored on disk rather than calling npm.
+        _node.exec_path.cache_clear()
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        assert npm_calls == [True]
+
+        # Changing the executable invalidates the stored path.
+        os.utime(path, (0, 0))
+        _node.exec_path.cache_clear()
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        assert npm_calls == [True, True]
+    finally:
+        _node.exec_path.cache_clear()
+
+
+def test_exec_path_local_not_stored(monkeypatch: MonkeyPatch, tmp_path: str) -> None:
+    bin_dir = os.path.join(str(tmp_path), "bin")
+    os.makedirs(bin_dir)
+    path = _make_executable(bin_dir, "altair-saver-test-vl2vg")
+    npm_calls: List[bool] = []
+
+    def npm_bin(global_: bool) -> str:
+        npm_calls.append(global_)
+        return bin_dir if not global_ else str(tmp_path)
+
+    monkeypatch.delenv(_node.EXEC_PATH_ENV, raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", os.path.join(str(tmp_path), "cache"))
+    monkeypatch.setattr(_node, "npm_bin", npm_bin)
+    try:
+        _node.exec_path.cache_clear()
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        assert npm_calls == [True, False]
+
+        # Paths in the local bin directory of a project are looked up again.
+        _node.exec_path.cache_clear()
+        assert _node.exec_path("altair-saver-test-vl2vg") == path
+        assert npm_calls == [True, False, True, False]
+    finally:
+        _node.exec_path.cache_clear()
+
+
+def test_save_async(monkeypatch: MonkeyPatch) -> None:
+    calls: List[str] = []
+
+    async def check_output_with_stderr_async(
+        cmd: List[str], input: bytes, **kwargs: Any
+    ) -> bytes:
+        calls.append(cmd[0])
+        await asyncio.sleep(0)
+        if cmd[0] == "vl2vg":
+            return b'{"marks": []}'
+        assert input == b'{"marks": []}'
+        return b"<svg></svg>"
+
+    monkeypatch.setattr(_node, "exec_path", lambda name: name)
+    monkeypatch.setattr(
+        _node, "check_output_with_stderr_async", check_output_with_stderr_async
+    )
+    monkeypatch.setattr(_node, "compile_cache", TieredCache())
+
+    saver = NodeSaver({"mark": "point"})
+    assert asyncio.run(saver.save_async(fmt="svg")) == "<svg></svg>"
+    bundle = asyncio.run(saver.mimebundle_async(["vega", "png"]))
+    assert bundle == {
+        fmt_to_mimetype("vega"): {"marks": []},
+        fmt_to_mimetype("png"): b"<svg></svg>",
+    }
+    assert calls == ["vl2vg", "vg2svg", "vg2png"]
+
+    # Formats rendered concurrently share a single compile.
+    calls.clear()
+    saver = NodeSaver({"mark": "line"})
+    bundle = asyncio.run(saver.mimebundle_async(["vega", "png", "svg"]))
+    assert len(bundle) == 3
+    assert calls.count("vl2vg") == 1
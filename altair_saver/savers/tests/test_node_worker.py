@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import json
+import os
+import pickle
+import shutil
+import subprocess
+from typing import Iterator, List
+
+import pytest
+from _pytest.capture import SysCapture
+
+from altair_saver.savers._node_worker import (
+    NodeWorker,
+    NodeWorkerError,
+    NodeWorkerPool,
+)
+
+NODE = shutil.which("node")
+
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is not available")
+
+# Minimal stand-ins for the vega & vega-lite packages.
+FAKE_VEGALITE = """
+exports.compile = function(spec) {
+  if (spec.fail) { throw new Error("compile failed"); }
+  if (spec.crash) { process.exit(1); }
+  if (spec.warn) { console.warn("WARN " + spec.warn); }
+  if (spec.sleep) {
+    Atomics.wait(new Int32Array(new SharedArrayBuffer(4)), 0, 0, spec.sleep);
+  }
+  if (spec.pid) { return {spec: {pid: process.pid}}; }
+  return {spec: {compiled: spec}};
+};
+"""
+FAKE_VEGA = "exports.version = 'fake';"
+
+
+def _make_package(root: str, name: str, source: str) -> str:
+    package_dir = os.path.join(root, name)
+    module_dir = os.path.join(package_dir, "node_modules", name)
+    os.makedirs(module_dir)
+    with open(os.path.join(package_dir, "package.json"), "w") as f:
+        json.dump({"name": f"{name}-host"}, f)
+    with open(os.path.join(module_dir, "index.js"), "w") as f:
+        f.write(source)
+    return package_dir
+
+
+@pytest.fixture
+def package_dirs(tmp_path: str) -> List[str]:
+    return [
+        _make_package(str(tmp_path), "vega-lite", FAKE_VEGALITE),
+        _make_package(str(tmp_path), "vega", FAKE_VEGA),
+    ]
+
+
+@pytest.fixture
+def worker(package_dirs: List[str]) -> Iterator[NodeWorker]:
+    assert NODE is not None
+    worker = NodeWorker(NODE, package_dirs)
+    yield worker
+    worker.stop()
+
+
+def test_worker_request(worker: NodeWorker) -> None:
+    for i in range(3):
+        out = worker.request(json.dumps({"i": i}).encode(), "vega-lite", "vega")
+        assert json.loads(out) == {"compiled": {"i": i}}
+    assert worker.alive
+    assert worker.requests == 3
+
+
+def test_worker_request_out(worker: NodeWorker) -> None:
+    out = io.BytesIO()
+    spec = json.dumps({"data": "x" * 200000}).encode()
+    assert worker.request(spec, "vega-lite", "vega", out=out) == b""
+    assert json.loads(out.getvalue()) == {"compiled": {"data": "x" * 200000}}
+
+
+def test_worker_request_bad_out(worker: NodeWorker) -> None:
+    # A failure while copying the output leaves unread data on the worker's
+    # stdout, so the worker must be stopped rather than reused.
+    spec = json.dumps({"data": "x" * 200000}).encode()
+    with pytest.raises(TypeError):
+        worker.request(spec, "vega-lite", "vega", out=io.StringIO())  # type: ignore
+    assert not worker.alive
+    assert worker.request(b"{}", "vega-lite", "vega") == b'{"compiled":{}}'
+
+
+def test_worker_large_request(worker: NodeWorker) -> None:
+    # Large requests arrive in many chunks, and are followed by another request.
+    data = [{"x": i, "label": "x" * 100} for i in range(100000)]
+    out = worker.request(json.dumps({"data": data}).encode(), "vega-lite", "vega")
+    assert json.loads(out) == {"compiled": {"data": data}}
+    assert worker.request(b"{}", "vega-lite", "vega") == b'{"compiled":{}}'
+
+
+def test_worker_error(worker: NodeWorker) -> None:
+    with pytest.raises(NodeWorkerError) as err:
+        worker.request(b'{"fail": true}', "vega-lite", "vega")
+    assert "compile failed" in str(err.value)
+    assert worker.request(b"{}", "vega-lite", "vega") == b'{"compiled":{}}'
+
+    # Errors can be handled like those of the command-line tools, and survive
+    # being passed between processes.
+    assert isinstance(err.value, subprocess.CalledProcessError)
+    assert b"compile failed" in err.value.stderr
+    assert str(pickle.loads(pickle.dumps(err.value))) == str(err.value)
+
+
+def test_worker_restart(worker: NodeWorker) -> None:
+    with pytest.raises(subprocess.CalledProcessError):
+        worker.request(b'{"crash": true}', "vega-lite", "vega")
+    assert not worker.alive
+    assert worker.request(b"{}", "vega-lite", "vega") == b'{"compiled":{}}'
+    assert worker.alive
+
+
+def test_worker_log(worker: NodeWorker, capsys: SysCapture) -> None:
+    worker.request(b'{"warn": "shown"}', "vega-lite", "vega")
+    worker.request(b'{"warn": "hidden"}', "vega-lite", "vega", lambda s: False)
+    captured = capsys.readouterr()
+    assert "WARN shown" in captured.err
+    assert "WARN hidden" not in captured.err
+
+
+def test_worker_missing_packages(tmp_path: str) -> None:
+    assert NODE is not None
+    worker = NodeWorker(NODE, [str(tmp_path), str(tmp_path)])
+    with pytest.raises(NodeWorkerError):
+        worker.start()
+    assert not worker.alive
+
+
+@pytest.fixture
+def pool(package_dirs: List[str]) -> Iterator[NodeWorkerPool]:
+    assert NODE is not None
+    pool = NodeWorkerPool(NODE, package_dirs, size=2, max_requests=None)
+    yield pool
+    pool.stop()
+
+
+def test_pool_parallel(pool: NodeWorkerPool) -> None:
+    spec = b'{"pid": true, "sleep": 50}'
+    with ThreadPoolExecutor(6) as executor:
+        results = executor.map(
+            lambda i: pool.request(spec, "vega-lite", "vega"), range(6)
+        )
+        pids = {json.loads(result)["pid"] for result in results}
+    assert len(pids) == 2
+    assert len(pool._workers) == 2
+
+
+def test_pool_recycle(pool: NodeWorkerPool) -> None:
+    pool.size = 1
+    pool.max_requests = 2
+    pids = [
+        json.loads(pool.request(b'{"pid": true}', "vega-lite", "vega"))["pid"]
+        for i in range(4)
+    ]
+    assert pids[0] == pids[1]
+    assert pids[1] != pids[2]
+    assert pids[2] == pids[3]
+
+
+def test_pool_restart(pool: NodeWorkerPool) -> None:
+    pool.size = 1
+    with pytest.raises(NodeWorkerError):
+        pool.request(b'{"crash": true}', "vega-lite", "vega")
+    assert pool.request(b"{}", "vega-lite", "vega") == b'{"compiled":{}}'
@@ -1,7 +1,12 @@
+import base64
+from concurrent.futures import ThreadPoolExecutor
 import io
 import json
 import os
-from typing import Any, Dict, IO, Iterator, Tuple
+import time
+import urllib.request
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+from unittest.mock import ANY
 
 import altair as alt
 import pandas as pd
@@ -11,6 +16,8 @@ from selenium.common.exceptions import WebDriverException
 from _pytest.monkeypatch import MonkeyPatch
 
 from altair_saver import SeleniumSaver, JavascriptError
+from altair_saver.cache import TieredCache
+from altair_saver.savers import _selenium
 from altair_saver.types import JSONDict
 from altair_saver._utils import fmt_to_mimetype, internet_connected
 from altair_saver.savers.tests._utils import SVGImage
@@ -95,12 +102,51 @@ def test_stop_and_start(name: str, data: Dict[str, Any]) -> None:
     assert bundle1 == bundle2
 
 
-@pytest.mark.parametrize("enabled", [True, False])
-def test_enabled(monkeypatch: MonkeyPatch, enabled: bool) -> None:
+@pytest.mark.parametrize("executable", ["chromedriver", "geckodriver", None])
+def test_enabled(monkeypatch: MonkeyPatch, executable: Optional[str]) -> None:
+    calls = []
+
+    def which(name: str) -> Optional[str]:
+        calls.append(name)
+        return f"/bin/{name}" if name == executable else None
+
+    def get(driver: str, driver_timeout: int) -> None:
+        raise AssertionError("enabled() should not start a browser")
+
+    monkeypatch.setattr(_selenium.shutil, "which", which)
+    monkeypatch.setattr(SeleniumSaver._registry, "get", get)
+    monkeypatch.setattr(SeleniumSaver, "_probe", None)
+    assert SeleniumSaver.enabled() is (executable is not None)
+    expected = {"chromedriver": "chrome", "geckodriver": "firefox", None: None}
+    assert SeleniumSaver._probe_webdriver() == expected[executable]
+
+    # The result is cached until the probe expires.
+    ncalls = len(calls)
+    SeleniumSaver.enabled()
+    assert len(calls) == ncalls
+    monkeypatch.setattr(SeleniumSaver, "probe_ttl", 0)
+    SeleniumSaver.enabled()
+    assert len(calls) > ncalls
+
+
+def test_webdriver_started_on_render(
+    monkeypatch: MonkeyPatch, use_driver: Callable[..., None], spec: JSONDict
+) -> None:
+    selected = []
+
+    def select_webdriver(cls: type, driver_timeout: int) -> str:
+        selected.append(driver_timeout)
+        return "chrome"
+
     monkeypatch.setattr(
-        SeleniumSaver, "_select_webdriver", lambda d: object() if enabled else None
+        SeleniumSaver, "_select_webdriver", classmethod(select_webdriver)
     )
-    assert SeleniumSaver.enabled() is enabled
+    use_driver(FakeDriver())
+    saver = SeleniumSaver(spec, driver_timeout=5)
+    assert selected == []
+    saver.mimebundle("svg")
+    saver.mimebundle("png")
+    assert selected == [5]
 
 
 @pytest.mark.parametrize("webdriver", ["chrome", "firefox"])
@@ -163,3 +209,397 @@ def test_scale_factor(spec: JSONDict, fmt: str, kwds: Dict[str, Any]) -> None:
 
         assert im2.width == 2 * im1.width
         assert im2.height == 2 * im1.height
+
+
+def test_compile_cache(monkeypatch: MonkeyPatch, spec: JSONDict) -> None:
+    calls = []
+
+    def extract(fmts: List[str]) -> List[JSONDict]:
+        calls.extend(fmts)
+        return [{"marks": []}]
+
+    monkeypatch.setattr(_selenium, "compile_cache", TieredCache())
+    for i in range(2):
+        saver = SeleniumSaver(spec, webdriver="chrome")
+        monkeypatch.setattr(saver, "_extract_formats", extract)
+        assert saver.mimebundle("vega").popitem()[1] == {"marks": []}
+    assert calls == ["vega"]
+
+
+class FakeDriver:
+    """Stand-in for a WebDriver, recording page loads."""
+
+    outputs = {
+        "png": "data:image/png;base64," + base64.b64encode(b"PNG").decode(),
+        "svg": "<svg></svg>",
+        "vega": {"marks": []},
+    }
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self.scripts = 0
+        self.alive = True
+        self.script_timeouts: List[float] = []
+
+    @property
+    def current_url(self) -> str:
+        if not self.alive:
+            raise WebDriverException("driver is not running")
+        return "about:blank"
+
+    def quit(self) -> None:
+        self.alive = False
+
+    def get(self, url: str) -> None:
+        if url != "about:blank":
+            self.loads += 1
+
+    def find_element_by_id(self, id: str) -> None:
+        pass
+
+    def set_script_timeout(self, timeout: float) -> None:
+        self.script_timeouts.append(timeout)
+
+    def execute_async_script(self, code: str, *args: Any) -> JSONDict:
+        self.scripts += 1
+        if code == _selenium.BATCH_CODE:
+            items, fmts, concurrency, upload_url = args
+            return {"result": [self._render(spec, fmts) for spec, opt in items]}
+        spec, opt, fmts, upload_url = args
+        return self._render(spec, fmts)
+
+    def _render(self, spec: JSONDict, fmts: List[str]) -> JSONDict:
+        if spec.get("fail"):
+            return {"error": "render failed"}
+        return {"result": [self.outputs[fmt] for fmt in fmts]}
+
+
+@pytest.fixture
+def use_driver(monkeypatch: MonkeyPatch) -> Iterator[Callable[..., None]]:
+    """Render charts with a stand-in driver rather than a browser.
+
+    Pages are served at a dummy url, unless ``serve`` is True, in which case
+    they are served by the provider with stand-in scripts.
+    """
+
+    def use_driver(driver: FakeDriver, serve: bool = False) -> None:
+        monkeypatch.setattr(SeleniumSaver._registry, "checkout", lambda *a: driver)
+        monkeypatch.setattr(SeleniumSaver._registry, "checkin", lambda *a, **k: None)
+        if serve:
+            monkeypatch.setattr(
+                _selenium, "get_bundled_script", lambda p, v: f"// {p}@{v}"
+            )
+        else:
+            monkeypatch.setattr(
+                SeleniumSaver, "_serve", classmethod(lambda *args: "url")
+            )
+        SeleniumSaver._stop_serving()
+
+    yield use_driver
+    SeleniumSaver._stop_serving()
+
+
+@pytest.mark.parametrize("reuse_page", [True, False])
+def test_reuse_page(
+    monkeypatch: MonkeyPatch,
+    use_driver: Callable[..., None],
+    spec: JSONDict,
+    reuse_page: bool,
+) -> None:
+    driver = FakeDriver()
+    use_driver(driver)
+    monkeypatch.setattr(SeleniumSaver, "page_max_renders", 3)
+
+    for i in range(4):
+        saver = SeleniumSaver(spec, webdriver="chrome", reuse_page=reuse_page)
+        assert saver.mimebundle("svg").popitem()[1] == "<svg></svg>"
+    assert driver.loads == (2 if reuse_page else 4)
+
+    # Pages are reloaded after an error.
+    with pytest.raises(JavascriptError):
+        SeleniumSaver({"fail": True}, mode="vega", webdriver="chrome")._extract("svg")
+    SeleniumSaver(spec, webdriver="chrome", reuse_page=reuse_page).mimebundle("svg")
+    assert driver.loads == (3 if reuse_page else 6)
+
+
+def test_mimebundle_single_render(
+    monkeypatch: MonkeyPatch, use_driver: Callable[..., None], spec: JSONDict
+) -> None:
+    driver = FakeDriver()
+    use_driver(driver)
+    monkeypatch.setattr(_selenium, "compile_cache", TieredCache())
+
+    saver = SeleniumSaver(spec, webdriver="chrome")
+    bundle = saver.mimebundle(["png", "svg", "vega"])
+    assert driver.scripts == 1
+    assert bundle == {
+        "image/png": b"PNG",
+        "image/svg+xml": "<svg></svg>",
+        fmt_to_mimetype("vega"): {"marks": []},
+    }
+
+    # The compiled spec is cached, so is not requested again.
+    saver.mimebundle(["svg", "vega"])
+    assert driver.scripts == 2
+
+
+def test_save_many(
+    monkeypatch: MonkeyPatch, use_driver: Callable[..., None], spec: JSONDict
+) -> None:
+    driver = FakeDriver()
+    use_driver(driver)
+
+    specs: List[JSONDict] = [spec, {"fail": True}, spec, spec, spec]
+    results = SeleniumSaver.save_many(
+        specs, "png", mode="vega-lite", batch_size=2, webdriver="chrome"
+    )
+    assert driver.scripts == 3
+    assert results[0] == results[2] == results[3] == results[4] == b"PNG"
+    assert isinstance(results[1], JavascriptError)
+    # Scripts are allowed time for each chart in the batch.
+    assert driver.script_timeouts == [60, 30]
+
+    # Invalid items are reported without being rendered.
+    results = SeleniumSaver.save_many(
+        [spec, spec], "vega", mode="vega", webdriver="chrome"
+    )
+    assert driver.scripts == 3
+    assert all(isinstance(result, ValueError) for result in results)
+
+    # Compiled specs are returned in the same form from the cache.
+    monkeypatch.setattr(_selenium, "compile_cache", TieredCache())
+    miss = SeleniumSaver.save_many([spec], "vega", webdriver="chrome")
+    assert driver.scripts == 4
+    _selenium.compile_cache.set(
+        SeleniumSaver(spec)._compile_cache_key(), b'{"marks":[]}'
+    )
+    hit = SeleniumSaver.save_many([spec], "vega", webdriver="chrome")
+    assert driver.scripts == 4
+    assert hit == miss == [json.dumps({"marks": []})]
+
+
+class FetchingDriver(FakeDriver):
+    """Stand-in for a WebDriver, fetching the pages it loads."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pages: List[str] = []
+
+    def get(self, url: str) -> None:
+        super().get(url)
+        if url != "about:blank":
+            with urllib.request.urlopen(url) as f:
+                self.pages.append(f.read().decode())
+
+
+@pytest.mark.parametrize("reuse_page", [True, False])
+def test_served_resources(
+    use_driver: Callable[..., None], spec: JSONDict, reuse_page: bool
+) -> None:
+    driver = FetchingDriver()
+    use_driver(driver, serve=True)
+
+    for i in range(3):
+        saver = SeleniumSaver(spec, webdriver="chrome", reuse_page=reuse_page)
+        saver.mimebundle("svg")
+    assert driver.pages[0] == driver.pages[-1]
+
+    # Scripts are served once per version, and single-use pages are released.
+    provider = SeleniumSaver._provider
+    assert provider is not None
+    scripts = [f"{p}-{v}.js" for p, v in saver._package_versions.items()]
+    pages = [url for url in SeleniumSaver._resources if url not in scripts]
+    assert sorted(SeleniumSaver._resources) == sorted(scripts + pages)
+    assert len(pages) == (1 if reuse_page else 0)
+    for route in scripts:
+        assert f'src="/{route}"' in driver.pages[0]
+        with urllib.request.urlopen(f"{provider.url}/{route}") as f:
+            assert f.read().decode().startswith("// ")
+    SeleniumSaver._stop_serving()
+    assert not SeleniumSaver._resources
+
+
+def test_serve_data_release() -> None:
+    SeleniumSaver._stop_serving()
+    try:
+        content = json.dumps([{"x": 1}])
+        url1 = SeleniumSaver._serve_data(content)
+        url2 = SeleniumSaver._serve_data(content)
+        assert url1 != url2
+        SeleniumSaver._release(url1)
+        with urllib.request.urlopen(url2) as f:
+            assert json.load(f) == [{"x": 1}]
+    finally:
+        SeleniumSaver._stop_serving()
+
+
+def test_serve_page_release(use_driver: Callable[..., None], spec: JSONDict) -> None:
+    use_driver(FakeDriver(), serve=True)
+    saver = SeleniumSaver(spec, webdriver="chrome", reuse_page=False)
+    url1 = saver._page_url()
+    url2 = saver._page_url()
+    assert url1 != url2
+    SeleniumSaver._release(url1)
+    with urllib.request.urlopen(url2) as f:
+        assert 'id="vis"' in f.read().decode()
+
+
+class DataFetchingDriver(FakeDriver):
+    """Stand-in for a WebDriver, fetching the data URLs of rendered specs."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.specs: List[JSONDict] = []
+        self.data: Dict[str, Any] = {}
+
+    def execute_async_script(self, code: str, *args: Any) -> JSONDict:
+        spec = args[0]
+        self.specs.append(spec)
+        for data in spec["data"] if isinstance(spec["data"], list) else [spec["data"]]:
+            if "url" in data:
+                with urllib.request.urlopen(data["url"]) as f:
+                    self.data[data["url"]] = json.load(f)
+        return super().execute_async_script(code, *args)
+
+
+@pytest.mark.parametrize("mode", ["vega", "vega-lite"])
+def test_data_urls(
+    monkeypatch: MonkeyPatch, use_driver: Callable[..., None], mode: str
+) -> None:
+    driver = DataFetchingDriver()
+    use_driver(driver)
+    monkeypatch.setattr(SeleniumSaver, "data_url_threshold", 100)
+    monkeypatch.setattr(_selenium, "compile_cache", TieredCache())
+
+    large = [{"x": i} for i in range(100)]
+    small = [{"x": 1}]
+    if mode == "vega":
+        spec: JSONDict = {
+            "data": [
+                {"name": "large", "values": large},
+                {"name": "small", "values": small},
+            ]
+        }
+        expected: JSONDict = {
+            "data": [{"name": "large", "url": ANY}, {"name": "small", "values": small}]
+        }
+    else:
+        spec = {
+            "datasets": {"large": large, "small": small},
+            "data": {"name": "large"},
+            "transform": [{"lookup": "x", "from": {"data": {"name": "small"}}}],
+        }
+        expected = {
+            "datasets": {"small": small},
+            "data": {"url": ANY},
+            "transform": [{"lookup": "x", "from": {"data": {"name": "small"}}}],
+        }
+
+    SeleniumSaver(spec, mode=mode, webdriver="chrome").mimebundle("svg")
+    assert driver.specs[-1] == expected
+    assert list(driver.data.values()) == [large]
+    assert not any(url.endswith(".json") for url in SeleniumSaver._resources)
+
+    # The compiled vega spec retains the inline data.
+    if mode == "vega-lite":
+        SeleniumSaver(spec, mode=mode, webdriver="chrome").mimebundle("vega")
+        assert driver.specs[-1] == spec
+
+    monkeypatch.setattr(SeleniumSaver, "data_url_threshold", None)
+    SeleniumSaver(spec, mode=mode, webdriver="chrome").mimebundle("svg")
+    assert driver.specs[-1] == spec
+
+
+class UploadingDriver(FakeDriver):
+    """Stand-in for a WebDriver, uploading png output to the data server."""
+
+    def execute_async_script(self, code: str, *args: Any) -> JSONDict:
+        provider = SeleniumSaver._provider
+        assert provider is not None
+        upload_url = args[3]
+        if code == _selenium.BATCH_CODE:
+            upload_urls = [f"{upload_url}-{i}" for i in range(len(args[0]))]
+        else:
+            upload_urls = [upload_url]
+        for i, url in enumerate(upload_urls):
+            request = urllib.request.Request(
+                provider.url + url, data=b"PNG%d" % i, method="POST"
+            )
+            urllib.request.urlopen(request).close()
+        result: Any = super().execute_async_script(code, *args)
+        if code == _selenium.BATCH_CODE:
+            return {"result": [{"result": [{"upload": url}]} for url in upload_urls]}
+        return {"result": [{"upload": upload_url}, *result["result"][1:]]}
+
+
+def test_png_upload(use_driver: Callable[..., None], spec: JSONDict) -> None:
+    driver = UploadingDriver()
+    use_driver(driver, serve=True)
+
+    saver = SeleniumSaver(spec, webdriver="chrome")
+    assert saver.mimebundle(["png", "svg"]) == {
+        "image/png": b"PNG0",
+        "image/svg+xml": "<svg></svg>",
+    }
+    results = SeleniumSaver.save_many([spec, spec], "png", webdriver="chrome")
+    assert results == [b"PNG0", b"PNG1"]
+
+    provider = SeleniumSaver._provider
+    assert provider is not None
+    assert provider.uploads == {}
+
+
+@pytest.fixture
+def registry(monkeypatch: MonkeyPatch) -> Iterator[_selenium._DriverRegistry]:
+    registry = _selenium._DriverRegistry()
+    monkeypatch.setattr(registry, "_create", lambda *args: FakeDriver())
+    yield registry
+    registry.stop()
+
+
+def test_driver_pool(registry: _selenium._DriverRegistry) -> None:
+    driver1 = registry.checkout("chrome", 20, size=2)
+    driver2 = registry.checkout("chrome", 20, size=2)
+    assert driver1 is not driver2
+
+    # With the pool exhausted, checkout waits for a driver to be checked in.
+    with ThreadPoolExecutor(1) as executor:
+        future = executor.submit(registry.checkout, "chrome", 20, 2)
+        time.sleep(0.1)
+        assert not future.done()
+        registry.checkin("chrome", driver1)
+        assert future.result(timeout=5) is driver1
+    registry.checkin("chrome", driver1)
+    registry.checkin("chrome", driver2)
+    assert registry.drivers["chrome"] == [driver1, driver2]
+    assert registry.get("chrome", 20) is driver1
+
+
+def test_driver_pool_recycle(registry: _selenium._DriverRegistry) -> None:
+    driver1 = registry.checkout("chrome", 20)
+    registry.checkin("chrome", driver1, max_renders=2)
+    assert registry.checkout("chrome", 20) is driver1
+    registry.checkin("chrome", driver1, max_renders=2)
+    assert not driver1.alive
+
+    driver2 = registry.checkout("chrome", 20)
+    assert driver2 is not driver1
+    registry.checkin("chrome", driver2, healthy=False)
+    assert not driver2.alive
+
+    # Idle drivers that fail their health check are replaced.
+    driver3 = registry.checkout("chrome", 20)
+    registry.checkin("chrome", driver3)
+    driver3.alive = False
+    assert registry.checkout("chrome", 20) not in [driver1, driver2, driver3]
+    assert len(registry.drivers["chrome"]) == 1
+
+
+def test_driver_pool_memory(registry: _selenium._DriverRegistry) -> None:
+    driver = registry.checkout("chrome", 20)
+    driver.execute_script = lambda code: 2000
+    registry.checkin("chrome", driver, max_memory=4000)
+    assert registry.checkout("chrome", 20) is driver
+    driver.execute_script = lambda code: 5000
+    registry.checkin("chrome", driver, max_memory=4000)
+    assert not driver.alive
@@ -0,0 +1,307 @@
+"""A local HTTP service for rendering charts.
+
+The service keeps node workers and browser drivers warm between requests, so
+that many processes can share a single set of renderers::
+
+    $ python -m altair_saver.serve --port 8000
+
+Charts are rendered by POSTing a JSON object to ``/render``::
+
+    {"spec": {...}, "format": "png"}
+
+with optional ``mode``, ``method``, ``embed_options`` and ``options`` (additional
+saver options, limited to ``ALLOWED_OPTIONS``). The response body is the rendered
+chart.
+``GET /stats`` returns the queue state and result cache counters.
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+from socketserver import ThreadingMixIn
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from altair_saver._core import save, _select_saver, _SAVER_METHODS
+from altair_saver.cache import result_cache
+from altair_saver.types import JSONDict
+from altair_saver._utils import fmt_to_mimetype
+
+# Saver options that clients may set in a request's "options". Other options,
+# such as fp or vega_cli_options, would give clients control of the server.
+ALLOWED_OPTIONS = {"scale_factor", "inline", "standalone", "deterministic_id"}
+
+# A small chart rendered by warm_up() to start node workers and browsers.
+WARM_UP_SPEC: JSONDict = {
+    "$schema": "https://vega.github.io/schema/vega-lite/v4.json",
+    "data": {"values": [{"x": 0}]},
+    "mark": "point",
+    "encoding": {"x": {"field": "x", "type": "quantitative"}},
+}
+
+
+def warm_up(methods: Sequence[str] = ("node", "selenium")) -> List[str]:
+    """Render a small chart with each enabled method.
+
+    Returns the methods that rendered successfully.
+    """
+    warmed = []
+    for method in methods:
+        if not _select_saver(method, mode="vega-lite").enabled():
+            continue
+        try:
+            save(WARM_UP_SPEC, fmt="svg", method=method)
+        except Exception:
+            # Errors will be reported to the requests that hit them.
+            continue
+        warmed.append(method)
+    return warmed
+
+
+class _RenderHandler(BaseHTTPRequestHandler):
+    server: "RenderServer"
+
+    def _respond(
+        self,
+        status: int,
+        content: bytes,
+        content_type: str = "text/plain; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self) -> None:
+        if self.path != "/stats":
+            self._respond(404, b"Not found")
+            return
+        content = json.dumps(self.server.stats).encode()
+        self._respond(200, content, "application/json")
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            self._respond(404, b"Not found")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._respond(400, b"Invalid Content-Length")
+            return
+        if length > self.server.max_request_bytes:
+            self._respond(413, b"Request too large")
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError as err:
+            self._respond(400, f"Invalid JSON: {err}".encode())
+            return
+
+        if not self.server.acquire():
+            self._respond(503, b"Server busy", headers={"Retry-After": "1"})
+            return
+        # Release the slot before responding, so that a client which has
+        # received its response sees the slot free again.
+        status, content_type = 200, "text/plain; charset=utf-8"
+        try:
+            content_type, content = self.server.render(request)
+        except (ValueError, TypeError) as err:
+            status, content = 400, str(err).encode()
+        except Exception as err:
+            status, content = 500, f"{type(err).__name__}: {err}".encode()
+        finally:
+            self.server.release()
+        self._respond(status, content, content_type)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class RenderServer(ThreadingMixIn, HTTPServer):
+    """HTTP server rendering charts with the altair_saver savers.
+
+    Parameters
+    ----------
+    address : tuple
+        The (host, port) to listen on. Port 0 selects a free port.
+    max_concurrency : integer
+        The number of charts rendered at once. The selenium driver pool is
+        enlarged to this size if necessary.
+    max_queue : integer
+        The number of requests that may wait for a render slot. Further
+        requests receive a 503 response.
+    queue_timeout : float or None
+        Seconds a request waits for a render slot before receiving a 503
+        response. If None, requests wait indefinitely.
+    cache : boolean
+        Whether to use ``altair_saver.cache.result_cache``. Default is True.
+    max_request_bytes : integer
+        The maximum size of a request body.
+    quiet : boolean
+        If True, do not log requests to stderr.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("localhost", 8000),
+        max_concurrency: int = 4,
+        max_queue: int = 32,
+        queue_timeout: Optional[float] = 30,
+        cache: bool = True,
+        max_request_bytes: int = 2 ** 26,
+        quiet: bool = False,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.cache = cache
+        self.max_request_bytes = max_request_bytes
+        self.quiet = quiet
+        self._host = address[0]
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        if max_concurrency > 1:
+            from altair_saver.savers import SeleniumSaver
+
+            SeleniumSaver.driver_pool_size = max(
+                SeleniumSaver.driver_pool_size, max_concurrency
+            )
+        super().__init__(address, _RenderHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self._host}:{self.server_port}"
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            active, queued = self._active, self._pending - self._active
+        return {"active": active, "queued": queued, "cache": result_cache.stats}
+
+    def acquire(self) -> bool:
+        """Wait for a render slot. Returns False if the request should be rejected."""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                return False
+            self._pending += 1
+        if self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self._active += 1
+            return True
+        with self._lock:
+            self._pending -= 1
+        return False
+
+    def release(self) -> None:
+        """Release a render slot obtained with acquire()."""
+        with self._lock:
+            self._active -= 1
+            self._pending -= 1
+        self._slots.release()
+
+    def render(self, request: Any) -> Tuple[str, bytes]:
+        """Render a chart request, returning the content type and content."""
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        spec = request.get("spec")
+        fmt = request.get("format")
+        options = request.get("options") or {}
+        if not isinstance(spec, dict):
+            raise ValueError("Request 'spec' must be a JSON object")
+        if not isinstance(fmt, str):
+            raise ValueError("Request 'format' must be a string")
+        if not isinstance(options, dict):
+            raise ValueError("Request 'options' must be a JSON object")
+        invalid = sorted(set(options) - ALLOWED_OPTIONS)
+        if invalid:
+            raise ValueError(
+                f"Invalid options: {invalid}. Allowed: {sorted(ALLOWED_OPTIONS)}"
+            )
+        mode = request.get("mode")
+        if mode not in (None, "vega", "vega-lite"):
+            raise ValueError("Request 'mode' must be 'vega' or 'vega-lite'")
+        method = request.get("method")
+        if method is not None and method not in _SAVER_METHODS:
+            raise ValueError(f"Request 'method' must be one of {list(_SAVER_METHODS)}")
+        embed_options = request.get("embed_options")
+        if embed_options is not None and not isinstance(embed_options, dict):
+            raise ValueError("Request 'embed_options' must be a JSON object")
+
+        content = save(
+            spec,
+            fmt=fmt,
+            mode=mode,
+            embed_options=embed_options,
+            method=method,
+            cache=self.cache,
+            **options,
+        )
+        if isinstance(content, str):
+            content = content.encode()
+        elif not isinstance(content, bytes):
+            content = json.dumps(content).encode()
+        return fmt_to_mimetype(fmt), content
+
+
+def serve(
+    host: str = "localhost",
+    port: int = 8000,
+    warm: bool = True,
+    **kwargs: Any,
+) -> None:
+    """Serve chart rendering over HTTP until interrupted.
+
+    Parameters
+    ----------
+    host : string
+        The host to listen on. Default is "localhost".
+    port : integer
+        The port to listen on. Default is 8000.
+    warm : boolean
+        If True (default), start node workers and browsers before serving.
+    **kwargs :
+        Additional keyword arguments are passed to RenderServer.
+    """
+    server = RenderServer((host, port), **kwargs)
+    if warm:
+        warm_up()
+    print(f"Serving altair_saver at {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m altair_saver.serve", description="Serve chart rendering."
+    )
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("-j", "--max-concurrency", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=32)
+    parser.add_argument("--queue-timeout", type=float, default=30)
+    parser.add_argument("--no-cache", dest="cache", action="store_false")
+    parser.add_argument("--no-warm", dest="warm", action="store_false")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+    serve(**vars(args))
+
+
+if __name__ == "__main__":
+    main()
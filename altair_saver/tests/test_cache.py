@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from altair_saver.cache import (
+    compile_cache_key,
+    spec_hash,
+    DiskCache,
+    LRUCache,
+    TieredCache,
+)
+
+
+def test_spec_hash() -> None:
+    assert spec_hash({"a": 1, "b": [1, 2]}) == spec_hash({"b": [1, 2], "a": 1})
+    assert spec_hash({"a": 1}) != spec_hash({"a": 2})
+    assert spec_hash({"a": 1}, "x") != spec_hash({"a": 1}, "y")
+
+
+def test_compile_cache_key() -> None:
+    spec = {"mark": "point"}
+    assert compile_cache_key(spec, "4.8.1") == compile_cache_key(spec, "4.8.1")
+    assert compile_cache_key(spec, "4.8.1") != compile_cache_key(spec, "4.17.0")
+
+
+def test_lru_cache() -> None:
+    cache = LRUCache(maxsize=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_disk_cache(tmp_path: str) -> None:
+    cache = DiskCache(str(tmp_path), max_bytes=25)
+    cache.set("a", b"0" * 10)
+    cache.set("b", b"1" * 10)
+    os.utime(os.path.join(str(tmp_path), "a"), (0, 0))
+    os.utime(os.path.join(str(tmp_path), "b"), (1, 1))
+    cache.set("c", b"2" * 10)
+    assert cache.get("a") is None
+    assert cache.get("b") == b"1" * 10
+    assert cache.get("c") == b"2" * 10
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Entries are visible to other instances sharing the directory.
+    assert DiskCache(str(tmp_path)).get("c") == b"2" * 10
+
+    cache.clear()
+    assert os.listdir(str(tmp_path)) == []
+
+
+@pytest.mark.parametrize("use_disk", [True, False])
+def test_tiered_cache(tmp_path: str, use_disk: bool) -> None:
+    directory = str(tmp_path) if use_disk else None
+    cache = TieredCache(maxsize=1, directory=directory)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("b") == b"2"
+    if use_disk:
+        assert cache.get("a") == b"1"
+        assert cache.stats == {"hits": 1, "misses": 1, "disk_hits": 1, "disk_misses": 0}
+    else:
+        assert cache.get("a") is None
+        assert cache.stats == {"hits": 1, "misses": 1}
@@ -0,0 +1,83 @@
+import json
+import os
+from typing import Any
+
+from _pytest.capture import CaptureFixture
+
+from altair_saver._cli import main, MANIFEST_NAME
+from altair_saver.types import JSONDict
+
+SPEC: JSONDict = {
+    "data": {"values": [{"a": 1, "b": 2}]},
+    "mark": "point",
+    "encoding": {"x": {"field": "a", "type": "quantitative"}},
+}
+
+
+def test_cli(tmp_path: Any, capsys: CaptureFixture) -> None:
+    subdir = tmp_path / "sub"
+    subdir.mkdir()
+    for filename in [tmp_path / "a.vl.json", subdir / "b.vl.json"]:
+        filename.write_text(json.dumps(SPEC))
+    args = [str(tmp_path), "-f", "html,json", "-j", "2"]
+
+    assert main(args) == 0
+    assert capsys.readouterr().out.strip() == "4 saved, 0 up to date, 0 failed"
+    assert json.loads((subdir / "b.json").read_text()) == SPEC
+    assert (tmp_path / "a.html").read_text().strip().startswith("<!DOCTYPE html>")
+    assert os.path.exists(subdir / MANIFEST_NAME)
+
+    assert main(args) == 0
+    assert capsys.readouterr().out.strip() == "0 saved, 4 up to date, 0 failed"
+
+    (subdir / "b.vl.json").write_text(json.dumps({**SPEC, "mark": "bar"}))
+    assert main(args) == 0
+    assert capsys.readouterr().out.strip() == "2 saved, 2 up to date, 0 failed"
+
+    assert main(args + ["--force"]) == 0
+    assert capsys.readouterr().out.strip() == "4 saved, 0 up to date, 0 failed"
+
+
+def test_cli_errors(tmp_path: Any, capsys: CaptureFixture) -> None:
+    (tmp_path / "bad.vl.json").write_text("{")
+    (tmp_path / "good.vl.json").write_text(json.dumps(SPEC))
+    output_dir = tmp_path / "out"
+
+    status = main([str(tmp_path), "-f", "html", "-m", "basic", "-o", str(output_dir)])
+    assert status == 1
+    out, err = capsys.readouterr()
+    assert out.strip() == "0 saved, 0 up to date, 1 failed"
+    assert "bad.vl.json" in err
+    assert "good.html: ValueError" in err
+    assert not os.path.exists(output_dir / MANIFEST_NAME)
+
+
+def test_cli_output_dir(tmp_path: Any, capsys: CaptureFixture) -> None:
+    for name in ["a", "b"]:
+        (tmp_path / "in" / name).mkdir(parents=True)
+        (tmp_path / "in" / name / "c.vl.json").write_text(json.dumps(SPEC))
+    output_dir = tmp_path / "out"
+    args = [str(tmp_path / "in"), "-f", "json", "-o", str(output_dir)]
+
+    assert main(args) == 0
+    assert capsys.readouterr().out.strip() == "2 saved, 0 up to date, 0 failed"
+    assert json.loads((output_dir / "a" / "c.json").read_text()) == SPEC
+    assert json.loads((output_dir / "b" / "c.json").read_text()) == SPEC
+
+    assert main(args) == 0
+    assert capsys.readouterr().out.strip() == "0 saved, 2 up to date, 0 failed"
+
+
+def test_cli_output_conflict(tmp_path: Any, capsys: CaptureFixture) -> None:
+    inputs = []
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "c.vl.json").write_text(json.dumps({**SPEC, "name": name}))
+        inputs.append(str(tmp_path / name / "c.vl.json"))
+    output_dir = tmp_path / "out"
+
+    assert main(inputs + ["-f", "json", "-o", str(output_dir)]) == 1
+    out, err = capsys.readouterr()
+    assert out.strip() == "1 saved, 0 up to date, 0 failed"
+    assert f"output {output_dir / 'c.json'} conflicts with {inputs[0]}" in err
+    assert json.loads((output_dir / "c.json").read_text())["name"] == "a"
@@ -1,6 +1,10 @@
+import asyncio
+import gc
 import io
 import json
-from typing import Dict, List, Optional, Union, Type
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union, Type
 
 import altair as alt
 import pandas as pd
@@ -12,14 +16,19 @@ from _pytest.monkeypatch import MonkeyPatch
 from altair_saver import (
     available_formats,
     save,
+    save_async,
+    save_many,
     render,
+    render_async,
     BasicSaver,
     HTMLSaver,
     NodeSaver,
     Saver,
     SeleniumSaver,
 )
+from altair_saver import _core
 from altair_saver._core import _select_saver
+from altair_saver.cache import TieredCache
 from altair_saver.types import JSONDict
 from altair_saver._utils import (
     fmt_to_mimetype,
@@ -218,6 +227,234 @@ def test_render_spec(spec: JSONDict) -> None:
             check_output(content, fmt)
 
 
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_save_async(spec: JSONDict, fmt: str) -> None:
+    result = asyncio.run(save_async(spec, fmt=fmt))
+    assert result is not None
+    check_output(result, fmt)
+
+
+@pytest.mark.parametrize("fmt", ["json", "vega-lite"])
+def test_save_async_to_file(spec: JSONDict, fmt: str) -> None:
+    fp = io.StringIO()
+    assert asyncio.run(save_async(spec, fp, fmt=fmt)) is None
+    assert json.loads(fp.getvalue()) == spec
+
+
+def test_render_async(spec: JSONDict) -> None:
+    bundle = asyncio.run(render_async(spec, fmts=FORMATS))
+    assert len(bundle) == len(FORMATS)
+    for mimetype, content in bundle.items():
+        fmt = mimetype_to_fmt(mimetype)
+        if isinstance(content, dict):
+            check_output(json.dumps(content), fmt)
+        else:
+            check_output(content, fmt)
+
+
+def test_render_groups_formats(monkeypatch: MonkeyPatch, spec: JSONDict) -> None:
+    calls: List[List[str]] = []
+
+    def mimebundle(self: Saver, fmts: List[str]) -> Dict[str, str]:
+        calls.append(fmts)
+        return {fmt_to_mimetype(fmt): "" for fmt in fmts}
+
+    monkeypatch.setattr(BasicSaver, "mimebundle", mimebundle)
+    monkeypatch.setattr(HTMLSaver, "mimebundle", mimebundle)
+    bundle = render(spec, fmts=["json", "html", "vega-lite"])
+    assert len(bundle) == 3
+    assert calls == [["json", "vega-lite"], ["html"]]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_save_many(spec: JSONDict, executor: str, tmp_path: Any) -> None:
+    filename = str(tmp_path / "chart.vl.json")
+    items = [
+        (spec, None, "html"),
+        (spec, filename, None),
+        (spec, None, "bad-format"),
+        (spec, None, "vega-lite"),
+    ]
+    results = dict(save_many(items, method="basic", executor=executor))
+    assert sorted(results) == [0, 1, 2, 3]
+    assert isinstance(results[0], ValueError)
+    assert results[1] is None
+    assert isinstance(results[2], ValueError)
+    assert isinstance(results[3], str)
+    assert json.loads(results[3]) == spec
+    with open(filename) as f:
+        assert json.load(f) == spec
+
+    results = dict(save_many(items[:1], executor=executor))
+    assert isinstance(results[0], str)
+    assert results[0].strip().startswith("<!DOCTYPE html>")
+
+
+def test_save_many_submits_as_read(monkeypatch: MonkeyPatch, spec: JSONDict) -> None:
+    submitted = threading.Event()
+
+    def save(*args: Any, **kwargs: Any) -> str:
+        submitted.set()
+        return "saved"
+
+    def items() -> Iterator[Any]:
+        yield spec, None, "json"
+        # The first chart is saved before the remaining items are read.
+        assert submitted.wait(timeout=10)
+        yield spec, None, "json"
+
+    monkeypatch.setattr(_core, "save", save)
+    results = dict(save_many(items(), method="basic"))
+    assert results == {0: "saved", 1: "saved"}
+
+
+def test_save_many_bounded(monkeypatch: MonkeyPatch, spec: JSONDict) -> None:
+    saved: List[None] = []
+
+    def save(*args: Any, **kwargs: Any) -> str:
+        time.sleep(0.01)
+        saved.append(None)
+        return "saved"
+
+    def items() -> Iterator[Any]:
+        for i in range(20):
+            # Items are not read far ahead of the charts being saved.
+            assert i - len(saved) <= 2
+            yield spec, None, "json"
+
+    monkeypatch.setattr(_core, "save", save)
+    results = dict(save_many(items(), method="basic", max_workers=1))
+    assert len(results) == 20
+
+
+def test_save_many_batches(
+    monkeypatch: MonkeyPatch, spec: JSONDict, tmp_path: Any
+) -> None:
+    calls: List[List[JSONDict]] = []
+
+    def batch_save_many(
+        specs: List[JSONDict], fmt: str, **kwargs: Any
+    ) -> List[Union[str, Exception]]:
+        calls.append(specs)
+        return [ValueError("bad") if s.get("bad") else f"<{fmt}>" for s in specs]
+
+    monkeypatch.setattr(SeleniumSaver, "save_many", batch_save_many)
+    filename = str(tmp_path / "chart.svg")
+    items = [
+        (spec, None, "svg"),
+        (spec, filename, None),
+        ({**spec, "bad": True}, None, "svg"),
+        (spec, None, "png"),
+    ]
+    results = dict(save_many(items, method="selenium"))
+    assert results[0] == "<svg>"
+    assert results[1] is None
+    assert isinstance(results[2], ValueError)
+    assert results[3] == "<png>"
+    assert sorted(len(specs) for specs in calls) == [1, 3]
+    with open(filename) as f:
+        assert f.read() == "<svg>"
+
+
+@pytest.mark.parametrize("suppress_data_warning", [True, False])
+def test_save_many_data_warning(
+    monkeypatch: MonkeyPatch, suppress_data_warning: bool
+) -> None:
+    calls: List[None] = []
+    monkeypatch.setattr(_core, "_check_data_transformer", lambda: calls.append(None))
+    chart = alt.Chart(pd.DataFrame({"x": range(3)})).mark_line().encode(x="x")
+    items = [(chart, None, "json")] * 3
+    results = dict(
+        save_many(
+            items,
+            method="basic",
+            validate=False,
+            suppress_data_warning=suppress_data_warning,
+        )
+    )
+    assert all(isinstance(result, str) for result in results.values())
+    assert len(calls) == (0 if suppress_data_warning else 1)
+
+
+def test_save_many_bad_executor(spec: JSONDict) -> None:
+    with pytest.raises(ValueError) as err:
+        list(save_many([(spec, None, "json")], executor="fiber"))
+    assert "Unrecognized executor: 'fiber'" in str(err.value)
+
+
+def test_validation_memo(monkeypatch: MonkeyPatch) -> None:
+    chart = alt.Chart(pd.DataFrame({"x": range(3)})).mark_line().encode(x="x")
+    calls: List[JSONDict] = []
+    validate = alt.Chart.validate
+
+    def counting_validate(cls: type, instance: JSONDict, schema: Any = None) -> None:
+        calls.append(instance)
+        validate(instance, schema)
+
+    monkeypatch.setattr(alt.Chart, "validate", classmethod(counting_validate))
+
+    out = save(chart, fmt="json")
+    render(chart, fmts=["vega-lite"])
+    assert len(calls) == 1
+    assert isinstance(out, str)
+    assert json.loads(out) == chart.to_dict()
+
+    # Changing the chart invalidates the memo.
+    chart.mark = "point"
+    out = save(chart, fmt="json")
+    assert isinstance(out, str)
+    assert json.loads(out)["mark"] == "point"
+    assert len(calls) == 3
+
+    chart.mark = "not-a-mark"
+    out = save(chart, fmt="json", validate=False)
+    assert isinstance(out, str)
+    assert json.loads(out)["mark"] == "not-a-mark"
+    assert len(calls) == 3
+    with pytest.raises(alt.utils.schemapi.SchemaValidationError):
+        save(chart, fmt="json")
+
+    key = id(chart)
+    assert key in _core._validated_specs
+    del chart
+    gc.collect()
+    assert key not in _core._validated_specs
+
+
+def test_result_cache(monkeypatch: MonkeyPatch, spec: JSONDict) -> None:
+    cache = TieredCache(maxsize=16)
+    monkeypatch.setattr(_core, "result_cache", cache)
+    calls: List[str] = []
+    serialize = HTMLSaver._serialize
+
+    def counting_serialize(self: HTMLSaver, fmt: str, content_type: str) -> Any:
+        calls.append(fmt)
+        return serialize(self, fmt, content_type)
+
+    monkeypatch.setattr(HTMLSaver, "_serialize", counting_serialize)
+
+    outputs = []
+    for _ in range(2):
+        fp = io.StringIO()
+        save(spec, fp, fmt="html", cache=True)
+        outputs.append(fp.getvalue())
+    assert outputs[0] == outputs[1]
+    assert calls == ["html"]
+    assert cache.stats == {"hits": 1, "misses": 1}
+
+    # Different options produce a different key.
+    save(spec, io.StringIO(), fmt="html", inline=True, cache=True)
+    assert calls == ["html", "html"]
+
+    bundles = [render(spec, fmts=["html", "json"], cache=True) for _ in range(2)]
+    assert bundles[0] == bundles[1]
+    assert calls == ["html", "html", "html"]
+
+    # Without cache=True, the result cache is not used.
+    save(spec, io.StringIO(), fmt="html")
+    assert calls == ["html", "html", "html", "html"]
+
+
 def test_infer_mode(spec: JSONDict) -> None:
     mimetype, vg_spec = render(spec, "vega").popitem()
     assert mimetype == fmt_to_mimetype("vega")
@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+from typing import Any
+
+import pytest
+
+import altair_saver
+from altair_saver import _core, savers
+
+# Modules that should only be imported when their saver is used.
+HEAVY_MODULES = {
+    "altair_data_server",
+    "altair_saver.savers._html",
+    "altair_saver.savers._selenium",
+    "altair_viewer",
+    "selenium",
+    "tornado",
+}
+
+
+def run_python(code: str) -> Any:
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output)
+
+
+def test_lazy_attributes() -> None:
+    from altair_saver.savers._selenium import JavascriptError, SeleniumSaver
+    from altair_saver.savers._html import HTMLSaver
+
+    assert altair_saver.HTMLSaver is savers.HTMLSaver is HTMLSaver
+    assert altair_saver.SeleniumSaver is savers.SeleniumSaver is SeleniumSaver
+    assert altair_saver.JavascriptError is savers.JavascriptError is JavascriptError
+    assert set(altair_saver.__all__) <= set(dir(altair_saver)) | set(
+        savers._LAZY_ATTRIBUTES
+    )
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import altair_saver",
+        "import altair_saver._cli",
+        "import altair_saver.serve",
+        "altair_saver.save({'mark': 'point'}, fmt='json')",
+        # pdf is only supported by the node saver.
+        "NodeSaver.enabled = classmethod(lambda cls: True)\n"
+        "assert _select_saver(None, mode='vega-lite', fmt='pdf') is NodeSaver",
+        # Without browser drivers, png falls through to the node saver.
+        "import shutil\n"
+        "shutil.which = lambda cmd, **kwargs: None\n"
+        "NodeSaver.enabled = classmethod(lambda cls: True)\n"
+        "assert _select_saver(None, mode='vega-lite', fmt='png') is NodeSaver",
+    ],
+)
+def test_import_is_lazy(code: str) -> None:
+    modules = run_python(
+        "import json, sys\n"
+        "import altair_saver\n"
+        "from altair_saver import NodeSaver\n"
+        "from altair_saver._core import _select_saver\n"
+        f"{code}\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    assert HEAVY_MODULES.isdisjoint(modules)
+
+
+def test_saver_executables() -> None:
+    from altair_saver.savers._selenium import DRIVER_EXECUTABLES
+
+    assert _core._SAVER_EXECUTABLES["selenium"] == list(DRIVER_EXECUTABLES.values())
+
+
+def test_saver_formats() -> None:
+    for method in _core._SAVER_METHODS:
+        saver_class = _core._saver_class(method)
+        assert _core._SAVER_FORMATS[method] == saver_class.valid_formats
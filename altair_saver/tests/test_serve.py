@@ -0,0 +1,126 @@
+import http.client
+import json
+import threading
+from typing import Any, Iterator, Tuple
+import urllib.error
+import urllib.request
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+from altair_saver import _core, serve
+from altair_saver.cache import TieredCache
+from altair_saver.serve import RenderServer
+from altair_saver.types import JSONDict
+
+SPEC: JSONDict = {
+    "data": {"values": [{"a": 1}]},
+    "mark": "point",
+    "encoding": {"x": {"field": "a", "type": "quantitative"}},
+}
+
+
+@pytest.fixture
+def server(monkeypatch: MonkeyPatch) -> Iterator[RenderServer]:
+    result_cache = TieredCache(maxsize=16)
+    monkeypatch.setattr(_core, "result_cache", result_cache)
+    monkeypatch.setattr(serve, "result_cache", result_cache)
+    server = RenderServer(("localhost", 0), max_concurrency=1, max_queue=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server: RenderServer, request: Any) -> Tuple[int, str, bytes]:
+    req = urllib.request.Request(
+        f"{server.url}/render", data=json.dumps(request).encode(), method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req) as response:
+            return response.status, response.headers["Content-Type"], response.read()
+    except urllib.error.HTTPError as err:
+        return err.code, err.headers["Content-Type"], err.read()
+
+
+def test_serve_render(server: RenderServer) -> None:
+    status, content_type, content = post(server, {"spec": SPEC, "format": "json"})
+    assert status == 200
+    assert content_type == "application/json"
+    assert json.loads(content) == SPEC
+
+    status, content_type, content = post(server, {"spec": SPEC, "format": "html"})
+    assert status == 200
+    assert content_type == "text/html"
+    assert content.decode().strip().startswith("<!DOCTYPE html>")
+
+    # Repeated requests are served from the result cache.
+    post(server, {"spec": SPEC, "format": "html"})
+    with urllib.request.urlopen(f"{server.url}/stats") as response:
+        stats = json.load(response)
+    assert stats == {"active": 0, "queued": 0, "cache": {"hits": 1, "misses": 2}}
+
+
+@pytest.mark.parametrize(
+    "request_, message",
+    [
+        ([], "Request must be a JSON object"),
+        ({"format": "png"}, "Request 'spec' must be a JSON object"),
+        ({"spec": SPEC}, "Request 'format' must be a string"),
+        ({"spec": SPEC, "format": "png", "method": "bad"}, "'method' must be one of"),
+        ({"spec": SPEC, "format": "png", "mode": "bad"}, "'mode' must be"),
+        ({"spec": SPEC, "format": "png", "embed_options": 1}, "'embed_options'"),
+        ({"spec": SPEC, "format": "json", "options": {"cache": 0}}, "Invalid options"),
+    ],
+)
+def test_serve_bad_request(server: RenderServer, request_: Any, message: str) -> None:
+    status, _, content = post(server, request_)
+    assert status == 400
+    assert message in content.decode()
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_serve_bad_content_length(server: RenderServer, length: str) -> None:
+    conn = http.client.HTTPConnection("localhost", server.server_port, timeout=10)
+    try:
+        conn.request("POST", "/render", body=b"", headers={"Content-Length": length})
+        response = conn.getresponse()
+        assert response.status == 400
+        assert response.read() == b"Invalid Content-Length"
+    finally:
+        conn.close()
+
+
+def test_serve_rejects_fp(server: RenderServer, tmp_path: Any) -> None:
+    filename = tmp_path / "injected.json"
+    request = {"spec": SPEC, "format": "json", "options": {"fp": str(filename)}}
+    status, _, content = post(server, request)
+    assert status == 400
+    assert "Invalid options: ['fp']" in content.decode()
+    assert not filename.exists()
+
+
+def test_serve_busy(server: RenderServer) -> None:
+    assert server.acquire()
+    try:
+        status, _, _ = post(server, {"spec": SPEC, "format": "json"})
+    finally:
+        server.release()
+    assert status == 503
+    status, _, _ = post(server, {"spec": SPEC, "format": "json"})
+    assert status == 200
+
+
+def test_serve_queue_timeout() -> None:
+    server = RenderServer(("localhost", 0), max_concurrency=1, queue_timeout=0.01)
+    try:
+        assert server.acquire()
+        assert not server.acquire()
+        assert server.stats["active"] == 1
+        assert server.stats["queued"] == 0
+        server.release()
+        assert server.acquire()
+        server.release()
+    finally:
+        server.server_close()
@@ -1,3 +1,4 @@
+import asyncio
 import http
 import io
 import socket
@@ -18,6 +19,8 @@ from altair_saver._utils import (
     mimetype_to_fmt,
     temporary_filename,
     check_output_with_stderr,
+    check_output_with_stderr_async,
+    check_pipeline_with_stderr,
 )
 
 
@@ -157,3 +160,78 @@ def test_check_output_with_stderr(
         assert captured.err == "second error\n"
     else:
         assert captured.err == "first error\nsecond error\n"
+
+
+@pytest.mark.parametrize("cmd_error", [True, False])
+@pytest.mark.parametrize("use_filter", [True, False])
+def test_check_pipeline_with_stderr(
+    capsys: SysCapture, use_filter: bool, cmd_error: bool
+) -> None:
+    cmds = [
+        ["sh", "-c", ">&2 echo 'first error' && cat"],
+        ["sh", "-c", ">&2 echo 'second error' && tr a-z A-Z"],
+    ]
+    stderr_filter = None if not use_filter else lambda line: line.startswith("second")
+
+    if cmd_error:
+        cmds[0][-1] += " && exit 1"
+        with pytest.raises(subprocess.CalledProcessError) as err:
+            check_pipeline_with_stderr(
+                cmds, input=b"the output", stderr_filter=stderr_filter
+            )
+        assert err.value.cmd == cmds[0]
+        assert err.value.stderr == b"first error\n"
+    else:
+        output = check_pipeline_with_stderr(
+            cmds, input=b"the output", stderr_filter=stderr_filter
+        )
+        assert output == b"THE OUTPUT"
+
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+    # stderr of the two commands is printed in the order it arrives.
+    if use_filter:
+        assert captured.err == "second error\n"
+    else:
+        assert sorted(captured.err.splitlines()) == ["first error", "second error"]
+
+
+def test_check_pipeline_with_stderr_out() -> None:
+    out = io.BytesIO()
+    cmds = [["cat"], ["tr", "a-z", "A-Z"]]
+    result = check_pipeline_with_stderr(cmds, input=b"abc" * 100000, out=out)
+    assert result == b""
+    assert out.getvalue() == b"ABC" * 100000
+
+
+@pytest.mark.parametrize("cmd_error", [True, False])
+@pytest.mark.parametrize("use_filter", [True, False])
+def test_check_output_with_stderr_async(
+    capsys: SysCapture, use_filter: bool, cmd_error: bool
+) -> None:
+    cmd = ["sh", "-c", '>&2 printf "first error\nsecond error\n" && cat']
+    stderr_filter = None if not use_filter else lambda line: line.startswith("second")
+
+    if cmd_error:
+        cmd[-1] += " && exit 1"
+        with pytest.raises(subprocess.CalledProcessError) as err:
+            asyncio.run(
+                check_output_with_stderr_async(
+                    cmd, input=b"the output", stderr_filter=stderr_filter
+                )
+            )
+        assert err.value.stderr == b"first error\nsecond error\n"
+    else:
+        output = asyncio.run(
+            check_output_with_stderr_async(
+                cmd, input=b"the output", stderr_filter=stderr_filter
+            )
+        )
+        assert output == b"the output"
+
+    captured = capsys.readouterr()
+    if use_filter:
+        assert captured.err == "second error\n"
+    else:
+        assert captured.err == "first error\nsecond error\n"
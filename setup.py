@@ -68,6 +68,7 @@ setup(
     include_package_data=True,
     install_requires=get_install_requirements("requirements.txt"),
     entry_points={
+        "console_scripts": ["altair_saver=altair_saver._cli:main"],
         "altair.vegalite.v4.renderer": ["altair_saver=altair_saver:render"],
         "altair.vega.v5.renderer": ["altair_saver=altair_saver:render"],
     },